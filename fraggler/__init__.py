@@ -3,61 +3,69 @@ fraggler.
 Easy Fragment Analyzing in python!
 """
 
+import importlib
+
 __author__ = "William Rosenbaum and Pär Larsson"
 
-from .ladder_fitting.fit_ladder_model import FitLadderModel
-from .ladder_fitting.peak_ladder_assigner import PeakLadderAssigner
-from .ladders.ladders import LADDERS
-from .plotting.plot_ladder import PlotLadder
-from .utils.baseline_removal import baseline_arPLS
-from .utils.fsa_file import FsaFile
-from .utils.utils import get_files, setup_logging
-from .utils.fraggler_object import (
-    FragglerPeak,
-    FragglerArea,
-    make_fraggler_peak,
-    make_fraggler_area,
-)
-from .applications.peak_area_multiplex import PeakAreaDeMultiplex
-from .plotting.plot_peak_area import PlotPeakArea
-from .plotting.plot_raw_data import PlotRawData
-from .plotting.plot_peaks import PlotPeaks
-from .plotting.plot_channels import make_fsa_data_df, plot_fsa_data
-from .reports.reports import (
-    generate_peak_report,
-    generate_area_report,
-    generate_no_peaks_report,
-)
-from .functions.generate_peak_table import generate_peak_table
-from .utils.peak_finder import PeakFinder
-from .cli import peak_report, area_report
-
-
-__all__ = [
-    "FitLadderModel",
-    "PeakLadderAssigner",
-    "LADDERS",
-    "baseline_arPLS",
-    "FsaFile",
-    "PeakArea",
-    "PeakAreaDeMultiplex",
-    "PlotPeakArea",
-    "PlotLadder",
-    "PlotRawData",
-    "PlotPeaks",
-    "generate_peak_table",
-    "get_files",
-    "setup_logging",
-    "make_fsa_data_df",
-    "plot_fsa_data",
-    "PeakFinder",
-    "FragglerPeak",
-    "FragglerArea",
-    "make_fraggler_peak",
-    "make_fraggler_area",
-    "generate_peak_report",
-    "generate_area_report",
-    "generate_no_peaks_report",
-    "peak_report",
-    "area_report",
-]
+
+# name -> (module, attribute); resolved lazily on first access so that
+# `import fraggler` does not pay for matplotlib/panel/CLI imports
+_LAZY_ATTRIBUTES = {
+    "FitLadderModel": ("fraggler.ladder_fitting.fit_ladder_model", "FitLadderModel"),
+    "PeakLadderAssigner": (
+        "fraggler.ladder_fitting.peak_ladder_assigner",
+        "PeakLadderAssigner",
+    ),
+    "LADDERS": ("fraggler.ladders.ladders", "LADDERS"),
+    "PlotLadder": ("fraggler.plotting.plot_ladder", "PlotLadder"),
+    "baseline_arPLS": ("fraggler.utils.baseline_removal", "baseline_arPLS"),
+    "FsaFile": ("fraggler.utils.fsa_file", "FsaFile"),
+    "get_files": ("fraggler.utils.utils", "get_files"),
+    "setup_logging": ("fraggler.utils.utils", "setup_logging"),
+    "FragglerFailure": ("fraggler.utils.fraggler_object", "FragglerFailure"),
+    "FragglerPeak": ("fraggler.utils.fraggler_object", "FragglerPeak"),
+    "FragglerArea": ("fraggler.utils.fraggler_object", "FragglerArea"),
+    "make_fraggler_peak": ("fraggler.utils.fraggler_object", "make_fraggler_peak"),
+    "make_fraggler_area": ("fraggler.utils.fraggler_object", "make_fraggler_area"),
+    "make_fragglers_batch": ("fraggler.utils.fraggler_object", "make_fragglers_batch"),
+    "PeakAreaDeMultiplex": (
+        "fraggler.applications.peak_area_multiplex",
+        "PeakAreaDeMultiplex",
+    ),
+    "PlotPeakArea": ("fraggler.plotting.plot_peak_area", "PlotPeakArea"),
+    "PlotRawData": ("fraggler.plotting.plot_raw_data", "PlotRawData"),
+    "PlotPeaks": ("fraggler.plotting.plot_peaks", "PlotPeaks"),
+    "make_fsa_data_df": ("fraggler.plotting.plot_channels", "make_fsa_data_df"),
+    "plot_fsa_data": ("fraggler.plotting.plot_channels", "plot_fsa_data"),
+    "generate_peak_report": ("fraggler.reports.reports", "generate_peak_report"),
+    "generate_area_report": ("fraggler.reports.reports", "generate_area_report"),
+    "generate_no_peaks_report": (
+        "fraggler.reports.reports",
+        "generate_no_peaks_report",
+    ),
+    "generate_peak_table": (
+        "fraggler.functions.generate_peak_table",
+        "generate_peak_table",
+    ),
+    "PeakFinder": ("fraggler.utils.peak_finder", "PeakFinder"),
+    "peak_report": ("fraggler.cli", "peak_report"),
+    "area_report": ("fraggler.cli", "area_report"),
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    try:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), attribute)
+    # cache so subsequent lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
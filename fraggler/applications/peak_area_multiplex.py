@@ -1,24 +1,69 @@
+import inspect
 import logging
-import re
+from dataclasses import dataclass
 import pandas as pd
 import numpy as np
-from lmfit.models import VoigtModel, GaussianModel, LorentzianModel
+from joblib import Parallel, delayed, parallel_backend
+from scipy.optimize import least_squares
 from scipy.signal import find_peaks, peak_widths
+from ..fit._kernels import (
+    gaussian,
+    gaussian_jacobian,
+    lorentzian,
+    lorentzian_jacobian,
+    voigt,
+    guess_peak,
+)
 from ..utils.peak_finder import PeakFinder
 
 
-class PeakAreaDeMultiplexIterator:
-    def __init__(self, number_of_assays):
-        self.number_of_assays = number_of_assays
-        self.current = 0
+# (kernel, jacobian) per model name; None means numeric differences
+_PEAK_MODELS = {
+    "gauss": (gaussian, gaussian_jacobian),
+    "voigt": (voigt, None),
+    "lorentzian": (lorentzian, lorentzian_jacobian),
+}
 
-    def __next__(self):
-        if self.current >= self.number_of_assays:
-            raise StopIteration
-        else:
-            result = self.current
-            self.current += 1
-            return result
+
+@dataclass
+class FitResult:
+    values: dict
+    best_fit: np.ndarray
+    rsquared: float
+
+
+def _fit_peak_model(kernel, jacobian, df: pd.DataFrame) -> FitResult:
+    """
+    Fit one peak window with the given lineshape kernel via
+    scipy.optimize.least_squares.
+    Module level so joblib can ship it to worker processes.
+    """
+    y = df.peaks.to_numpy(float)
+    # CHANGED to time instead of basepair
+    x = df.time.to_numpy(float)
+
+    names = list(inspect.signature(kernel).parameters)[1:]
+    guess = guess_peak(x, y)
+    if "gamma" in names:
+        guess["gamma"] = guess["sigma"]
+    p0 = [guess[name] for name in names]
+
+    result = least_squares(
+        lambda p: kernel(x, *p) - y,
+        p0,
+        jac=(lambda p: jacobian(x, *p)) if jacobian is not None else "2-point",
+        method="lm",
+    )
+
+    best_fit = kernel(x, *result.x)
+    ss_res = np.sum((y - best_fit) ** 2)
+    ss_tot = np.sum((y - y.mean()) ** 2)
+
+    return FitResult(
+        values=dict(zip(names, result.x)),
+        best_fit=best_fit,
+        rsquared=1 - ss_res / ss_tot,
+    )
 
 
 class PeakAreaDeMultiplex:
@@ -35,6 +80,19 @@ class PeakAreaDeMultiplex:
         self.peaks_index = self.peaks.peaks_index
         self.found_peaks = self.peaks.found_peaks
 
+        # cache the trace columns as arrays once; divide_peaks slices views
+        # of these instead of row-slicing the DataFrame per peak
+        self._time_arr = self.peaks_dataframe.time.to_numpy()
+        self._peaks_arr = self.peaks_dataframe.peaks.to_numpy()
+        self._basepairs_arr = self.peaks_dataframe.basepairs.to_numpy()
+
+        # last (model, assay) fitted; lets fit_assay_peaks skip refitting
+        # when the plots ask for the state the report just computed
+        self._last_fit_key = None
+        # combined assay table per model; the table export and the report
+        # both ask for it, so it is built once per sample
+        self._assays_df_cache = {}
+
         self.find_peak_widths()
         # divade peaks based on their assay they belonging
         self.divided_assays = self.divide_peak_assays()
@@ -51,7 +109,7 @@ class PeakAreaDeMultiplex:
         )
 
     def __iter__(self):
-        return PeakAreaDeMultiplexIterator(self.number_of_assays)
+        return iter(range(self.number_of_assays))
 
     def find_peak_widths(self, rel_height: float = 0.95):
         widths = peak_widths(
@@ -60,28 +118,45 @@ class PeakAreaDeMultiplex:
             rel_height=rel_height,
         )
 
-        df = pd.DataFrame(widths).T
-        df.columns = ["x", "peak_height", "peak_start", "peak_end"]
+        # Build the frame in one constructor instead of transposing the
+        # width tuple through object dtype and re-copying per .assign.
+        # floor/ceil write into the freshly returned width arrays, so the
+        # only allocation left is the int32 cast used for iloc indexing.
+        peak_start = np.floor(widths[2], out=widths[2]).astype(np.int32)
+        peak_end = np.ceil(widths[3], out=widths[3]).astype(np.int32)
 
-        self.peak_widths = (
-            df.assign(peak_start=lambda x: np.floor(x.peak_start).astype(int))
-            .assign(peak_end=lambda x: np.ceil(x.peak_end).astype(int))
-            .assign(peak_name=lambda x: range(1, x.shape[0] + 1))
-            .merge(self.peak_information, on="peak_name")
-        )
+        self.peak_widths = pd.DataFrame(
+            {
+                "x": widths[0],
+                "peak_height": widths[1],
+                "peak_start": peak_start,
+                "peak_end": peak_end,
+                "peak_name": np.arange(1, len(widths[0]) + 1),
+            }
+        ).merge(self.peak_information, on="peak_name")
 
     def divide_peak_assays(self) -> list[pd.DataFrame]:
         """
         Divide the peaks belonging to different assays based on their assay number
         """
+        # one grouping pass instead of one boolean mask per assay
         df = self.peak_widths
-        return [df.loc[df.assay == x] for x in df.assay.unique()]
+        groups = df.groupby("assay", sort=False).indices
+        return [df.iloc[index] for index in groups.values()]
 
     def divide_peaks(self, assay: pd.DataFrame, padding: int = 4) -> list[pd.DataFrame]:
         # add some padding to the left and right to be sure to include everything in the peak
+        starts = assay.peak_start.to_numpy() - padding
+        ends = assay.peak_end.to_numpy() + padding
         return [
-            self.peaks_dataframe.iloc[x.peak_start - padding : x.peak_end + padding]
-            for x in assay.itertuples()
+            pd.DataFrame(
+                {
+                    "time": self._time_arr[start:end],
+                    "peaks": self._peaks_arr[start:end],
+                    "basepairs": self._basepairs_arr[start:end],
+                }
+            )
+            for start, end in zip(starts, ends)
         ]
 
     def fit_lmfit_model(self, peak_finding_model: str, assay_number: int):
@@ -94,40 +169,29 @@ class PeakAreaDeMultiplex:
                 """
             )
 
-        if peak_finding_model == "gauss":
-            model = GaussianModel()
-        elif peak_finding_model == "voigt":
-            model = VoigtModel()
-        elif peak_finding_model == "lorentzian":
-            model = LorentzianModel()
-        else:
+        try:
+            kernel, jacobian = _PEAK_MODELS[peak_finding_model]
+        except KeyError:
             raise NotImplementedError(
                 f"""
-                {peak_finding_model} is not implemented! 
-                Options: [gauss, voigt, lorentzian]
+                {peak_finding_model} is not implemented!
+                Options: {list(_PEAK_MODELS)}
                 """
             )
 
-        fit_df = []
-        fit_params = []
-        fit_report = []
-        for df in self.divided_peaks[assay_number]:
-            df = df.copy()
-            y = df.peaks.to_numpy()
-            # CHANGED to time instead of basepair
-            x = df.time.to_numpy()
-
-            params = model.guess(y, x)
-            out = model.fit(y, params, x=x)
-
-            fit_df.append(df.assign(fitted=out.best_fit, model=peak_finding_model))
-            fit_params.append(out.values)
-            fit_report.append(out.fit_report())
+        # the fits are independent per peak, so run them in parallel
+        peaks = self.divided_peaks[assay_number]
+        results = Parallel(n_jobs=-1, prefer="processes")(
+            delayed(_fit_peak_model)(kernel, jacobian, df) for df in peaks
+        )
 
         # Update the instances of the model fit
-        self.fit_df = fit_df
-        self.fit_params = fit_params
-        self.fit_report = fit_report
+        self.fit_df = [
+            df.assign(fitted=out.best_fit, model=peak_finding_model)
+            for df, out in zip(peaks, results)
+        ]
+        self.fit_params = [out.values for out in results]
+        self.r_values = [out.rsquared for out in results]
 
     # TODO
     # Fix so that the cutoff is a range or something else.
@@ -142,7 +206,12 @@ class PeakAreaDeMultiplex:
 
         right_by_left = True
         if self.cutoff is not None:
-            if pd.concat(self.fit_df).basepairs.mean() < self.cutoff:
+            # mean basepair over all fitted windows, without concatenating
+            # the per-peak frames just to get one scalar
+            mean_basepairs = sum(df.basepairs.sum() for df in self.fit_df) / sum(
+                len(df) for df in self.fit_df
+            )
+            if mean_basepairs < self.cutoff:
                 right_by_left = False
 
         # if there only is 1 peak, return 0
@@ -168,33 +237,31 @@ class PeakAreaDeMultiplex:
         """
         Returns a DataFrame of each peak and its properties
         """
-        dataframes = []
-        for i, _ in enumerate(self.fit_df):
-            report = self.fit_report[i]
-            r_value = float(re.findall(r"R-squared *= (0\.\d{3})", report)[0])
-            df = (
-                self.fit_df[i]
-                .loc[lambda x: x.peaks == x.peaks.max()]
-                .assign(area=self.fit_params[i]["amplitude"])
-                .assign(r_value=r_value)
-                .assign(peak_name=f"Peak {i + 1}")
-                .drop(columns="time")
-                .reset_index(drop=True)
-                .rename(
-                    columns={
-                        "peaks": "peak_height",
-                        "fitted": "fitted_peak_height",
-                    }
-                )
-                .drop_duplicates("peak_name")
-                .assign(file_name=self.file_name)
-            )
-            dataframes.append(df)
+        # one row per fitted peak, taken at its maximum, built in a single
+        # constructor instead of an 8-step chain per peak plus a concat
+        max_index = [df.peaks.to_numpy().argmax() for df in self.fit_df]
+        number_of_peaks = len(self.fit_df)
 
-        self.assay_peak_area_df = pd.concat(dataframes).assign(
-            quotient=self.quotient,
-            peak_number=lambda x: x.shape[0],
-            assay_number=assay_number + 1,
+        self.assay_peak_area_df = pd.DataFrame(
+            {
+                "peak_height": [
+                    df.peaks.iloc[i] for df, i in zip(self.fit_df, max_index)
+                ],
+                "basepairs": [
+                    df.basepairs.iloc[i] for df, i in zip(self.fit_df, max_index)
+                ],
+                "fitted_peak_height": [
+                    df.fitted.iloc[i] for df, i in zip(self.fit_df, max_index)
+                ],
+                "model": [df.model.iloc[0] for df in self.fit_df],
+                "area": [params["amplitude"] for params in self.fit_params],
+                "r_value": self.r_values,
+                "peak_name": [f"Peak {i + 1}" for i in range(number_of_peaks)],
+                "file_name": self.file_name,
+                "quotient": self.quotient,
+                "peak_number": number_of_peaks,
+                "assay_number": assay_number + 1,
+            }
         )
 
     def fit_assay_peaks(
@@ -203,15 +270,42 @@ class PeakAreaDeMultiplex:
         assay_number: int,
     ) -> None:
         """
-        Runs fit_lmfit_model, calculate_quotient and peak_position_area_dataframe
+        Runs fit_lmfit_model, calculate_quotient and peak_position_area_dataframe.
+        Memoized on the last (model, assay) pair, so plotting an assay right
+        after the report fitted it reuses the state instead of refitting.
         """
+        key = (peak_finding_model, assay_number)
+        if self._last_fit_key == key:
+            return self.assay_peak_area_df
+
         self.fit_lmfit_model(peak_finding_model, assay_number)
         self.calculate_quotient()
         self.peak_position_area_dataframe(assay_number)
+        self._last_fit_key = key
         return self.assay_peak_area_df
 
+    def _fit_assay_peaks_pure(
+        self,
+        peak_finding_model: str,
+        assay_number: int,
+    ) -> pd.DataFrame:
+        """
+        Fit one assay and return its table. Run in a worker process, so the
+        fit state mutated on the way stays local to the worker's copy.
+        """
+        return self.fit_assay_peaks(peak_finding_model, assay_number)
+
     def assays_dataframe(self, peak_finding_model: str = "gauss"):
-        dfs = []
-        for i in self:
-            dfs.append(self.fit_assay_peaks(peak_finding_model, i))
-        return pd.concat(dfs, ignore_index=True)
+        if peak_finding_model in self._assays_df_cache:
+            return self._assays_df_cache[peak_finding_model]
+
+        # assays are independent; fit them across processes and cap the
+        # nested per-peak parallelism to avoid oversubscription
+        with parallel_backend("loky", inner_max_num_threads=1):
+            dfs = Parallel(n_jobs=-1)(
+                delayed(self._fit_assay_peaks_pure)(peak_finding_model, i)
+                for i in self
+            )
+        df = pd.concat(dfs, ignore_index=True)
+        self._assays_df_cache[peak_finding_model] = df
+        return df
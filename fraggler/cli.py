@@ -1,24 +1,33 @@
+from __future__ import annotations
+
 import fire
-import pandas as pd
 from pathlib import Path
+import concurrent.futures
+import os
 import sys
 import logging
-from colorama import Fore as f, init
-import matplotlib
 import warnings
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 warnings.simplefilter(action="ignore", category=FutureWarning)
 
 import fraggler
 
-# from colorama
-init(autoreset=True)
 
-# for windows user
-matplotlib.use("agg")
+def _use_agg_backend() -> None:
+    """
+    Force the non-interactive backend (for windows users and headless
+    workers); imported lazily so plain --help stays fast.
+    """
+    import matplotlib
+
+    matplotlib.use("agg")
 
 
-ASCII_ART = f"""{f.RED}
+ASCII_ART = """
             █████▒██▀███   ▄▄▄        ▄████   ▄████  ██▓    ▓█████  ██▀███
           ▓██   ▒▓██ ▒ ██▒▒████▄     ██▒ ▀█▒ ██▒ ▀█▒▓██▒    ▓█   ▀ ▓██ ▒ ██▒
           ▒████ ░▓██ ░▄█ ▒▒██  ▀█▄  ▒██░▄▄▄░▒██░▄▄▄░▒██░    ▒███   ▓██ ░▄█ ▒
@@ -30,23 +39,277 @@ ASCII_ART = f"""{f.RED}
                     ░           ░  ░      ░       ░     ░  ░   ░  ░   ░
 """
 
+
+def _color(name: str) -> str:
+    """
+    Return the ANSI escape for a colorama Fore color, or an empty string
+    when stdout is redirected; colorama itself is only imported when a
+    terminal is attached.
+    """
+    if not sys.stdout.isatty():
+        return ""
+    from colorama import Fore, init
+
+    init(autoreset=True)
+    return getattr(Fore, name)
+
 def save_df_format(
     peak_dfs: list,
     out_folder: str,
     in_path: str,
     out_format: str,
 ) -> None:
+    import pandas as pd
+
     # Save dataframe
-    df = pd.concat(peak_dfs).reset_index(drop=True)
+    # ignore_index builds the RangeIndex during concat instead of a
+    # second pass over the combined table
+    df = pd.concat(peak_dfs, ignore_index=True)
     out_name = f"{out_folder}/areatable_{Path(in_path).resolve().parts[-1]}"
     if out_format == "excel":
-        df.to_excel(f"{out_name}.xlsx", index=False)
+        # xlsxwriter writes much faster than the openpyxl default; its
+        # constant_memory mode is not usable here because pandas fills
+        # sheets column-wise and row-streaming would drop cells
+        df.to_excel(f"{out_name}.xlsx", index=False, engine="xlsxwriter")
     elif out_format == "csv":
         df.to_csv(f"{out_name}.csv", index=False)
     elif out_format == "json":
         df.to_json(f"{out_name}.json")
+    elif out_format == "parquet":
+        # columnar, much smaller and faster to read back than xlsx
+        df.to_parquet(f"{out_name}.parquet", index=False)
     else:
-        raise NotImplementedError("Choose between: csv, excel, json")
+        raise NotImplementedError("Choose between: csv, excel, json, parquet")
+
+
+
+def _warm_worker_imports() -> None:
+    """
+    Pool initializer: pay the heavy report imports once per worker at
+    startup, while the parent is still listing files, instead of inside
+    the first task each worker picks up.
+    """
+    _use_agg_backend()
+    import itables  # noqa: F401
+    import panel  # noqa: F401
+
+    import fraggler.reports.reports  # noqa: F401
+
+
+def _save_report(report, out_name: Path, compress: bool) -> None:
+    """
+    Save a panel report, optionally gzip-compressed to <name>.html.gz.
+    Reports embed base64 PNGs and a table and compress 5-10x; browsers
+    open .html.gz via any web server, or locally after `gunzip -k`.
+    """
+    if not compress:
+        report.save(out_name)
+        return
+
+    import gzip
+    import io
+
+    buffer = io.StringIO()
+    report.save(buffer, title=out_name.stem)
+    with gzip.open(f"{out_name}.gz", "wt", compresslevel=6) as out:
+        out.write(buffer.getvalue())
+
+
+def _process_area_file(
+    file: Path,
+    out_folder: Path,
+    ladder: str,
+    peak_model: str,
+    min_ratio: float,
+    min_height: int,
+    cutoff: int,
+    channel: str,
+    peak_height: int,
+    size_standard_channel: str | None,
+    distance_between_assays: int,
+    custom_peaks: str | None,
+    compress: bool,
+) -> tuple[pd.DataFrame | None, str | None, str | None]:
+    """
+    Process one file for the area report and save its HTML report.
+    Returns (peak_df, failed_name, no_peaks_name) with the unused slots None.
+    Module level so it can run in a worker process.
+    """
+    _use_agg_backend()
+    fraggler_object = fraggler.make_fraggler_area(
+        file=file,
+        ladder=ladder,
+        min_height=min_height,
+        min_ratio=min_ratio,
+        trace_channel=channel,
+        distance_between_assays=distance_between_assays,
+        size_standard_channel=size_standard_channel,
+        cutoff=cutoff,
+        peak_height=peak_height,
+        custom_peaks=custom_peaks,
+    )
+
+    # If make_fraggler_object failed; reuse the parsed FsaFile if any
+    if isinstance(fraggler_object, fraggler.FragglerFailure):
+        fsa = fraggler_object.fsa or fraggler.FsaFile(file, ladder)
+        report = fraggler.generate_no_peaks_report(fsa)
+        out_name = out_folder / f"{file.stem}_fraggler_failed.html"
+        _save_report(report, out_name, compress)
+        return None, fraggler_object.file_name, None
+
+    if not fraggler_object.peaks.found_peaks:
+        report = fraggler.generate_no_peaks_report(fraggler_object.fsa)
+        out_name = out_folder / f"{file.stem}_failed.html"
+        _save_report(report, out_name, compress)
+        return None, None, file.stem
+
+    # generate report and peak table
+    df = fraggler_object.areas.assays_dataframe(peak_model)
+    report = fraggler.generate_area_report(fraggler_object, peak_model)
+    out_name = out_folder / f"{file.stem}_fraggler_area.html"
+    _save_report(report, out_name, compress)
+    return df, None, None
+
+
+def _process_peak_file(
+    file: Path,
+    out_folder: Path,
+    ladder: str,
+    min_ratio: float,
+    min_height: int,
+    channel: str,
+    peak_height: int,
+    size_standard_channel: str | None,
+    distance_between_assays: int,
+    custom_peaks: str | None,
+    compress: bool,
+) -> tuple[pd.DataFrame | None, str | None, str | None]:
+    """
+    Process one file for the peak report and save its HTML report.
+    Returns (peak_df, failed_name, no_peaks_name) with the unused slots None.
+    Module level so it can run in a worker process.
+    """
+    _use_agg_backend()
+    fraggler_object = fraggler.make_fraggler_peak(
+        file=file,
+        ladder=ladder,
+        min_height=min_height,
+        min_ratio=min_ratio,
+        trace_channel=channel,
+        distance_between_assays=distance_between_assays,
+        size_standard_channel=size_standard_channel,
+        peak_height=peak_height,
+        custom_peaks=custom_peaks,
+    )
+
+    # If make_fraggler_object failed; reuse the parsed FsaFile if any
+    if isinstance(fraggler_object, fraggler.FragglerFailure):
+        fsa = fraggler_object.fsa or fraggler.FsaFile(file, ladder)
+        report = fraggler.generate_no_peaks_report(fsa)
+        out_name = out_folder / f"{file.stem}_fraggler_failed.html"
+        _save_report(report, out_name, compress)
+        return None, fraggler_object.file_name, None
+
+    if not fraggler_object.peaks.found_peaks:
+        report = fraggler.generate_no_peaks_report(fraggler_object.fsa)
+        out_name = out_folder / f"{file.stem}_failed.html"
+        _save_report(report, out_name, compress)
+        return None, None, file.stem
+
+    # add peaks to dataframe
+    df = fraggler_object.peaks.peak_information.assign(
+        file_name=fraggler_object.fsa.file_name
+    )[["file_name", "basepairs", "peaks"]].rename(columns={"peaks": "peak_height"})
+
+    # generate report
+    report = fraggler.generate_peak_report(fraggler_object)
+    out_name = out_folder / f"{file.stem}_fraggler_peak.html"
+    _save_report(report, out_name, compress)
+    return df, None, None
+
+
+def _run_report(
+    in_path: str,
+    out_folder: str,
+    out_format: str,
+    info: str,
+    process_fn,
+    process_args: tuple,
+) -> None:
+    """
+    Shared dispatcher for the report entrypoints: logging setup, file
+    iteration across worker processes, peak table save and failure
+    summary. `process_fn(file, out_folder, *process_args)` must return
+    (peak_df, failed_name, no_peaks_name) with the unused slots None.
+    """
+    # reject an unknown format before any file is processed; leaving it
+    # to save_df_format would throw away a whole cohort of compute
+    if out_format not in ("excel", "csv", "json", "parquet"):
+        raise NotImplementedError("Choose between: csv, excel, json, parquet")
+
+    print(f"{_color('RED')}{ASCII_ART}")
+
+    # Logging
+    fraggler.setup_logging(out_folder)
+    logging.info(info)
+
+    # Files
+    files = fraggler.get_files(in_path)
+    out_folder = Path(out_folder)
+
+    # For csv output each result is appended as it arrives, keeping
+    # memory flat in cohort size and leaving a valid partial table if a
+    # run is interrupted; the other formats need the full table in memory
+    csv_path = None
+    if out_format == "csv":
+        csv_path = out_folder / f"areatable_{Path(in_path).resolve().parts[-1]}.csv"
+
+    # Generate a report for each file; files are independent so they are
+    # processed across worker processes
+    failed_files = []
+    no_peaks = []
+    peak_dfs = []
+    wrote_csv = False
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=_warm_worker_imports,
+    ) as executor:
+        futures = {
+            executor.submit(process_fn, file, out_folder, *process_args): file
+            for file in files
+        }
+        for future in concurrent.futures.as_completed(futures):
+            logging.info(f"Processed file: {futures[future]}")
+            df, failed, no_peak = future.result()
+            if df is not None:
+                if csv_path is not None:
+                    df.to_csv(
+                        csv_path,
+                        mode="a" if wrote_csv else "w",
+                        header=not wrote_csv,
+                        index=False,
+                    )
+                    wrote_csv = True
+                else:
+                    peak_dfs.append(df)
+            if failed is not None:
+                failed_files.append(failed)
+            if no_peak is not None:
+                no_peaks.append(no_peak)
+
+    # Save dataframe
+    if peak_dfs:
+        save_df_format(peak_dfs, out_folder, in_path, out_format)
+
+    # log failed files
+    logging.info(f"Fraggler done for files in {in_path}!")
+
+    if failed_files:
+        failed_files = "\n".join(failed_files)
+        logging.warning(f"{_color('YELLOW')}Following files failed: {failed_files}")
+    if no_peaks:
+        no_peaks = "\n".join(no_peaks)
+        logging.warning(f"{_color('YELLOW')}Following files had no peaks: {no_peaks}")
 
 
 def area_report(
@@ -63,12 +326,8 @@ def area_report(
     distance_between_assays: int = 15,
     custom_peaks: str = None,
     out_format: str = "excel",
+    compress: bool = False,
 ) -> None:
-
-    print(ASCII_ART)
-
-    # Logging
-    fraggler.setup_logging(out_folder)
     INFO = f"""
     Runned command:
     {' '.join(sys.argv)}
@@ -88,68 +347,27 @@ def area_report(
         Size standard channel: {size_standard_channel}
         Distance between assays: {distance_between_assays}
     """
-    logging.info(INFO)
-
-    # Files
-    files = fraggler.get_files(in_path)
-    out_folder = Path(out_folder)
-
-    # Generate a peak area report for each file
-    failed_files = []
-    no_peaks = []
-    peak_dfs = []
-    for file in files:
-        logging.info(f"Processing file: {file}")
-        fraggler_object = fraggler.make_fraggler_area(
-            file=file,
-            ladder=ladder,
-            min_height=min_height,
-            min_ratio=min_ratio,
-            trace_channel=channel,
-            distance_between_assays=distance_between_assays,
-            size_standard_channel=size_standard_channel,
-            cutoff=cutoff,
-            peak_height=peak_height,
-            custom_peaks=custom_peaks,
-        )
-
-        # If make_fraggler_object failed
-        if isinstance(fraggler_object, str):
-            failed_files.append(fraggler_object)
-            fsa = fraggler.FsaFile(file, ladder)
-            report = fraggler.generate_no_peaks_report(fsa)
-            out_name = out_folder / f"{file.stem}_fraggler_failed.html"
-            report.save(out_name)
-            continue
-
-        if not fraggler_object.peaks.found_peaks:
-            no_peaks.append(file.stem)
-            fsa = fraggler.FsaFile(file, ladder)
-            report = fraggler.generate_no_peaks_report(fsa)
-            out_name = out_folder / f"{file.stem}_failed.html"
-            report.save(out_name)
-            continue
-
-        # generate report and peak table
-        peak_dfs.append(fraggler_object.areas.assays_dataframe(peak_model))
-        report = fraggler.generate_area_report(fraggler_object, peak_model)
-        out_name = out_folder / f"{file.stem}_fraggler_area.html"
-        report.save(out_name)
 
-    # Save dataframe
-    if peak_dfs:
-        save_df_format(peak_dfs, out_folder, in_path, out_format)
-            
-
-    # log failed files
-    logging.info(f"Fraggler done for files in {in_path}!")
-
-    if failed_files:
-        failed_files = "\n".join(failed_files)
-        logging.warning(f"{f.YELLOW}Following files failed: {failed_files}")
-    if no_peaks:
-        no_peaks = "\n".join(no_peaks)
-        logging.warning(f"{f.YELLOW}Following files had no peaks: {no_peaks}")
+    _run_report(
+        in_path,
+        out_folder,
+        out_format,
+        INFO,
+        _process_area_file,
+        (
+            ladder,
+            peak_model,
+            min_ratio,
+            min_height,
+            cutoff,
+            channel,
+            peak_height,
+            size_standard_channel,
+            distance_between_assays,
+            custom_peaks,
+            compress,
+        ),
+    )
 
 
 def peak_report(
@@ -164,12 +382,8 @@ def peak_report(
     distance_between_assays: int = 15,
     custom_peaks: str = None,
     out_format: str = "excel",
+    compress: bool = False,
 ) -> None:
-
-    print(ASCII_ART)
-
-    # Logging
-    fraggler.setup_logging(out_folder)
     INFO = f"""
     Runned command:
     {' '.join(sys.argv)}
@@ -187,71 +401,25 @@ def peak_report(
         Size standard channel: {size_standard_channel}
         Distance between assays: {distance_between_assays}
     """
-    logging.info(INFO)
 
-    # Files
-    files = fraggler.get_files(in_path)
-    out_folder = Path(out_folder)
-
-    # Generate a peak area report for each file
-    failed_files = []
-    no_peaks = []
-    peak_dfs = []
-    for file in files:
-        logging.info(f"Processing file: {file}")
-        fraggler_object = fraggler.make_fraggler_peak(
-            file=file,
-            ladder=ladder,
-            min_height=min_height,
-            min_ratio=min_ratio,
-            trace_channel=channel,
-            distance_between_assays=distance_between_assays,
-            size_standard_channel=size_standard_channel,
-            peak_height=peak_height,
-            custom_peaks=custom_peaks,
-        )
-
-        # If make_fraggler_object failed
-        if isinstance(fraggler_object, str):
-            failed_files.append(fraggler_object)
-            fsa = fraggler.FsaFile(file, ladder)
-            report = fraggler.generate_no_peaks_report(fsa)
-            out_name = out_folder / f"{file.stem}_fraggler_failed.html"
-            report.save(out_name)
-            continue
-
-        if not fraggler_object.peaks.found_peaks:
-            no_peaks.append(file.stem)
-            fsa = fraggler.FsaFile(file, ladder)
-            report = fraggler.generate_no_peaks_report(fsa)
-            out_name = out_folder / f"{file.stem}_failed.html"
-            report.save(out_name)
-            continue
-
-        # add peaks to dataframe
-        df = fraggler_object.peaks.peak_information.assign(
-            file_name=fraggler_object.fsa.file_name
-        )[["file_name", "basepairs", "peaks"]].rename(columns={"peaks": "peak_height"})
-        peak_dfs.append(df)
-
-        # generate report
-        report = fraggler.generate_peak_report(fraggler_object)
-        out_name = out_folder / f"{file.stem}_fraggler_peak.html"
-        report.save(out_name)
-
-    # Save dataframe
-    if peak_dfs:
-        save_df_format(peak_dfs, out_folder, in_path, out_format)
-
-    # log failed files
-    logging.info(f"Fraggler done for files in {in_path}!")
-
-    if failed_files:
-        failed_files = "\n".join(failed_files)
-        logging.warning(f"{f.YELLOW}Following files failed: {failed_files}")
-    if no_peaks:
-        no_peaks = "\n".join(no_peaks)
-        logging.warning(f"{f.YELLOW}Following files had no peaks: {no_peaks}")
+    _run_report(
+        in_path,
+        out_folder,
+        out_format,
+        INFO,
+        _process_peak_file,
+        (
+            ladder,
+            min_ratio,
+            min_height,
+            channel,
+            peak_height,
+            size_standard_channel,
+            distance_between_assays,
+            custom_peaks,
+            compress,
+        ),
+    )
 
 
 def run():
@@ -0,0 +1,95 @@
+"""
+Lineshape kernels and starting-value guesses for the peak fitting inner loop.
+
+The Gaussian and Lorentzian kernels are JIT-compiled with numba when numba is
+installed; otherwise the plain NumPy implementations are used. The Voigt
+kernel needs scipy.special.wofz and therefore always takes the NumPy path.
+The parameterization matches the classic lmfit models (amplitude = peak area).
+
+The public functions are thin wrappers with explicit signatures so that the
+parameter names can be introspected regardless of whether numba is present.
+"""
+
+import numpy as np
+from scipy.special import wofz
+
+try:
+    from numba import njit
+
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+
+def _maybe_jit(func):
+    if _HAS_NUMBA:
+        return njit(fastmath=True, cache=True)(func)
+    return func
+
+
+SQRT_2PI = np.sqrt(2 * np.pi)
+SQRT_2 = np.sqrt(2)
+
+
+@_maybe_jit
+def _gaussian_kernel(x, amplitude, center, sigma):
+    return (
+        amplitude / (sigma * SQRT_2PI) * np.exp(-((x - center) ** 2) / (2 * sigma**2))
+    )
+
+
+@_maybe_jit
+def _lorentzian_kernel(x, amplitude, center, sigma):
+    return amplitude / np.pi * sigma / ((x - center) ** 2 + sigma**2)
+
+
+def gaussian(x, amplitude=1.0, center=0.0, sigma=1.0):
+    return _gaussian_kernel(x, amplitude, center, sigma)
+
+
+def lorentzian(x, amplitude=1.0, center=0.0, sigma=1.0):
+    return _lorentzian_kernel(x, amplitude, center, sigma)
+
+
+def voigt(x, amplitude=1.0, center=0.0, sigma=1.0, gamma=1.0):
+    z = (x - center + 1j * gamma) / (sigma * SQRT_2)
+    return amplitude * wofz(z).real / (sigma * SQRT_2PI)
+
+
+def gaussian_jacobian(x, amplitude, center, sigma):
+    """
+    Analytic Jacobian of the Gaussian w.r.t. (amplitude, center, sigma),
+    one column per parameter.
+    """
+    unit = _gaussian_kernel(x, 1.0, center, sigma)
+    d_amplitude = unit
+    d_center = amplitude * unit * (x - center) / sigma**2
+    d_sigma = amplitude * unit * ((x - center) ** 2 / sigma**3 - 1 / sigma)
+    return np.stack([d_amplitude, d_center, d_sigma], axis=1)
+
+
+def lorentzian_jacobian(x, amplitude, center, sigma):
+    """
+    Analytic Jacobian of the Lorentzian w.r.t. (amplitude, center, sigma).
+    """
+    denominator = (x - center) ** 2 + sigma**2
+    d_amplitude = sigma / np.pi / denominator
+    d_center = amplitude / np.pi * 2 * sigma * (x - center) / denominator**2
+    d_sigma = amplitude / np.pi * (denominator - 2 * sigma**2) / denominator**2
+    return np.stack([d_amplitude, d_center, d_sigma], axis=1)
+
+
+def guess_peak(x: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Moment-based starting values for a single peak:
+    center at the maximum, sigma from the width at half maximum and
+    amplitude scaled so that the kernel height matches the data.
+    """
+    height = y.max()
+    center = x[np.argmax(y)]
+    step = (x[-1] - x[0]) / max(len(x) - 1, 1)
+    width_at_half = np.count_nonzero(y >= height / 2) * step
+    sigma = max(width_at_half / 2.355, step)
+    amplitude = height * sigma * SQRT_2PI
+
+    return {"amplitude": amplitude, "center": center, "sigma": sigma}
@@ -1,4 +1,6 @@
 import pandas as pd
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import fraggler
 
@@ -6,26 +8,59 @@ import fraggler
 # TODO just take Fraggler object
 def generate_peak_table(
     in_files: str | list,
+    ladder: str = "LIZ",
+    peak_model: str = "gauss",
+    min_height: int = 30,
+    cutoff: int = 175,
+    min_ratio: float = 0.2,
+    trace_channel: str = "DATA1",
+    custom_peaks: str = None,
 ) -> pd.DataFrame:
     if isinstance(in_files, str):
         in_files = [x for x in Path(in_files).iterdir() if x.suffix == ".fsa"]
 
     peak_dfs = []
-    for x in in_files:
-        try:
-            fsa = fraggler.FsaFile(
-                x, ladder, min_height=min_height, trace_channel=trace_channel
-            )
-            pla = fraggler.PeakLadderAssigner(fsa)
-            model = fraggler.FitLadderModel(pla)
-            pam = fraggler.PeakAreaDeMultiplex(
-                model,
-                cutoff=cutoff,
-                min_ratio=min_ratio,
-                custom_peaks=custom_peaks,
-            )
-            peak_dfs.append(pam.assays_dataframe(peak_model))
-        except:
-            print(f"FAILED: {fsa.file_name}")
+    # Parse the next files on a small thread pool so the ABIF disk reads
+    # overlap with the fitting work on the current file. The deque keeps
+    # at most three parses in flight to bound memory.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        files = deque(in_files)
+        prefetched = deque()
+        while files or prefetched:
+            while files and len(prefetched) < 3:
+                file = files.popleft()
+                prefetched.append(
+                    (
+                        file,
+                        executor.submit(
+                            fraggler.FsaFile,
+                            file,
+                            ladder,
+                            min_height=min_height,
+                            trace_channel=trace_channel,
+                        ),
+                    )
+                )
 
-    return pd.concat(peak_dfs).reset_index(drop=True)
+            file, future = prefetched.popleft()
+            try:
+                fsa = future.result()
+                pla = fraggler.PeakLadderAssigner(fsa)
+                model = fraggler.FitLadderModel(pla)
+                peaks = fraggler.PeakFinder(
+                    model,
+                    min_ratio=min_ratio,
+                    custom_peaks=custom_peaks,
+                )
+                pam = fraggler.PeakAreaDeMultiplex(
+                    peaks,
+                    cutoff=cutoff,
+                )
+                peak_dfs.append(pam.assays_dataframe(peak_model))
+            except:
+                print(f"FAILED: {Path(file).name}")
+
+    if not peak_dfs:
+        return pd.DataFrame()
+
+    return pd.concat(peak_dfs, ignore_index=True)
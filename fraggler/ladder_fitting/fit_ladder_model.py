@@ -3,10 +3,9 @@ Class to fit model to ladder and size standard
 """
 
 import logging
-from sklearn.pipeline import make_pipeline
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import SplineTransformer
 from sklearn.metrics import mean_squared_error, r2_score
+from scipy.interpolate import UnivariateSpline
+import numpy as np
 import pandas as pd
 
 from fraggler.ladder_fitting.peak_ladder_assigner import PeakLadderAssigner
@@ -21,6 +20,24 @@ class LadderNotFoundError(Exception):
     pass
 
 
+class SplineModel:
+    """
+    Interpolating spline through the ladder peaks, exposing the same
+    .predict(X) API as the sklearn pipeline it replaces.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, k: int = 3, s: float = 0) -> None:
+        self.k = k
+        self.s = s
+        self.spline = UnivariateSpline(x, y, k=k, s=s)
+
+    def predict(self, X) -> np.ndarray:
+        return self.spline(np.asarray(X).ravel())
+
+    def __repr__(self) -> str:
+        return f"SplineModel(k={self.k}, s={self.s})"
+
+
 class FitLadderModel:
     def __init__(self, ladder_assigner: PeakLadderAssigner) -> None:
         """
@@ -32,7 +49,7 @@ class FitLadderModel:
         Returns:
             None.
         """
-        self.n_knots = 2
+        self.spline_smoothing = 0
         self.ladder_assigner = ladder_assigner
         self.fsa_file = self.ladder_assigner.fsa_file
         self.best_combination = ladder_assigner.assign_ladder_peak_sizes().reshape(
@@ -79,25 +96,31 @@ class FitLadderModel:
         Returns:
             Dataframe with columns time, peaks and basepairs.
         """
+        # the time axis does not change between retries, build it once.
+        # float32/int32 halve the working set of the trace-length columns;
+        # the basepair scale (~0-1000) loses nothing at float32 precision
+        trace = self.fsa_file.trace.astype(np.float32, copy=False)
+        time = np.arange(trace.size, dtype=np.int32)
+
         # Continue loop until all basepairs are unique by changing n_knots in SplineTransformer
         for _ in range(10):
-            df = (
-                pd.DataFrame({"peaks": self.fsa_file.trace})
-                .reset_index()
-                .rename(columns={"index": "time"})
-                .assign(
-                    basepairs=lambda x: self.model.predict(
-                        x.time.to_numpy().reshape(-1, 1)
-                    )
-                )
-                .loc[lambda x: x.basepairs >= 0]
-            )
+            # mask and uniqueness check stay in NumPy; the DataFrame is
+            # only built for the accepted result
+            basepairs = self.model.predict(time).astype(np.float32, copy=False)
+            mask = basepairs >= 0
 
-            if df.shape[0] == df.basepairs.nunique():
+            if np.unique(basepairs[mask]).size == np.count_nonzero(mask):
                 logging.info(f"Ladder fitting model: {self.model}")
-                return df
-            # If not all bp are unique
-            self.n_knots += 1
+                return pd.DataFrame(
+                    {
+                        "time": time[mask],
+                        "peaks": trace[mask],
+                        "basepairs": basepairs[mask],
+                    }
+                )
+            # If not all bp are unique, smooth the spline a little and
+            # refit; each retry is a single cheap fitpack call
+            self.spline_smoothing += len(self.fsa_file.ref_sizes)
             self.fit_model()
 
         raise ModelFittingError(
@@ -111,18 +134,13 @@ class FitLadderModel:
         Returns:
             None.
         """
-        self.model = make_pipeline(
-            SplineTransformer(
-                degree=4, n_knots=self.n_knots + 4, extrapolation="continue"
-            ),
-            LinearRegression(fit_intercept=True),
+        self.model = SplineModel(
+            self.best_combination.ravel(),
+            self.fsa_file.ref_sizes,
+            k=4,
+            s=self.spline_smoothing,
         )
 
-        X = self.best_combination
-        y = self.fsa_file.ref_sizes
-
-        self.model.fit(X, y)
-
     def _fit_LIZ_ladder(self) -> None:
         """
         Fit model with LIZ ladder.
@@ -130,14 +148,9 @@ class FitLadderModel:
         Returns:
             None.
         """
-        # NB!
-        # Changed the SplineTransformer(n_knots=2) instead of 3!!
-        self.model = make_pipeline(
-            SplineTransformer(degree=3, n_knots=self.n_knots, extrapolation="continue"),
-            LinearRegression(fit_intercept=True),
+        self.model = SplineModel(
+            self.best_combination.ravel(),
+            self.fsa_file.ref_sizes,
+            k=3,
+            s=self.spline_smoothing,
         )
-
-        X = self.best_combination
-        y = self.fsa_file.ref_sizes
-
-        self.model.fit(X, y)
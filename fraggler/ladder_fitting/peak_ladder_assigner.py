@@ -1,14 +1,65 @@
-import pandas as pd
+from dataclasses import dataclass
+
 import numpy as np
-import networkx as nx
 from scipy import signal
+from scipy.linalg import solve_banded
 from sklearn.metrics import r2_score
-from sklearn.preprocessing import minmax_scale
-from scipy.interpolate import UnivariateSpline
 
+from fraggler.fit._kernels import _maybe_jit
 from fraggler.utils.fsa_file import FsaFile
 
 
+@_maybe_jit
+def _natural_spline_max_d2(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    Maximum absolute second derivative of the natural cubic spline
+    through (x, y), solved directly from the tridiagonal knot system
+    with the Thomas algorithm. For a natural spline the second
+    derivative is piecewise linear, so its maximum is attained at a knot.
+    """
+    n = x.shape[0]
+    m = n - 2
+    if m <= 0:
+        return 0.0
+
+    h = x[1:] - x[:-1]
+
+    diag = np.empty(m)
+    upper = np.empty(m)
+    rhs = np.empty(m)
+    for i in range(m):
+        diag[i] = 2.0 * (h[i] + h[i + 1])
+        upper[i] = h[i + 1]
+        rhs[i] = 6.0 * ((y[i + 2] - y[i + 1]) / h[i + 1] - (y[i + 1] - y[i]) / h[i])
+
+    # forward elimination; row i couples to row i - 1 through h[i]
+    for i in range(1, m):
+        w = h[i] / diag[i - 1]
+        diag[i] -= w * upper[i - 1]
+        rhs[i] -= w * rhs[i - 1]
+
+    # back substitution; the boundary second derivatives are zero
+    second_derivatives = np.empty(m)
+    second_derivatives[m - 1] = rhs[m - 1] / diag[m - 1]
+    for i in range(m - 2, -1, -1):
+        second_derivatives[i] = (rhs[i] - upper[i] * second_derivatives[i + 1]) / diag[i]
+
+    return np.abs(second_derivatives).max()
+
+
+@dataclass
+class _PeakGraph:
+    """
+    CSR adjacency of the ladder-peak DAG: node i has successors
+    indices[indptr[i]:indptr[i + 1]], each a later peak within
+    max_ladder_trace_distance.
+    """
+
+    peaks: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+
+
 class PeakLadderAssigner:
     """
     A class that assigns peak sizes to a ladder for use in DNA fragment size analysis.
@@ -40,6 +91,27 @@ class PeakLadderAssigner:
 
         self.fsa_file = fsa_file
 
+        # ref_sizes is fixed for the ladder, so everything the score
+        # functions derive from it is computed once here. float32 is
+        # lossless for peak positions (integer sample indices) and the
+        # scores are only ranked, never reported
+        ref_sizes = np.asarray(fsa_file.ref_sizes, dtype=np.float32)
+        self._ref_diff = np.diff(ref_sizes)
+        self._ref_lo = float(ref_sizes[0])
+        self._ref_hi = float(ref_sizes[-1])
+        self._ref_span = self._ref_hi - self._ref_lo
+
+        # tridiagonal knot system of the natural-spline score; only the
+        # right-hand sides change between combinations
+        interior = ref_sizes.size - 2
+        h = self._ref_diff
+        banded = np.zeros((3, max(interior, 0)), dtype=np.float32)
+        if interior > 0:
+            banded[0, 1:] = h[1:-1]
+            banded[1, :] = 2.0 * (h[:-1] + h[1:])
+            banded[2, :-1] = h[1:-1]
+        self._spline_banded = banded
+
     def assign_ladder_peak_sizes(self):
         """
         Assigns peak sizes to a ladder based on the given parameters and returns the best combination.
@@ -74,80 +146,107 @@ class PeakLadderAssigner:
         peaks = peaks_obj[0]
         heights = peaks_obj[1]["peak_heights"]
 
-        df = pd.DataFrame({"peaks": peaks, "heights": heights})
-
         # TODO
         # Dropped the below, then it worked with the new test files
         # idxmax = df["heights"].idxmax()
         # df = df.drop(idxmax)
 
-        peaks_adj = df.nlargest(self.fsa_file.max_peak_count, ["heights"])
+        # top-k selection straight on the find_peaks arrays: argpartition
+        # is O(n) and only the k survivors get sorted
+        k = min(self.fsa_file.max_peak_count, heights.size)
+        tallest = np.argpartition(heights, -k)[-k:]
 
-        return peaks_adj["peaks"].sort_values().to_numpy()
+        return np.sort(peaks[tallest])
 
-    def generate_graph(self, peaks) -> nx.DiGraph:
+    def generate_graph(self, peaks) -> _PeakGraph:
         """
-        Generates a graph based on the peaks and returns the graph.
+        Generates the peak DAG in CSR form and returns it.
 
         Args:
         peaks (np.array): the peaks array
 
         Returns:
-        nx.DiGraph: the graph object
+        _PeakGraph: the CSR graph object
         """
-        G = nx.DiGraph()
-
-        for p in peaks:
-            G.add_node(p)
+        # peaks are sorted, so node i's successors are the contiguous run
+        # (i, upper[i]); binary search finds the band bounds without the
+        # O(n^2) broadcast comparison
+        n = peaks.size
+        upper = np.searchsorted(
+            peaks, peaks + self.fsa_file.max_ladder_trace_distance, side="right"
+        )
+        counts = np.maximum(upper - np.arange(1, n + 1), 0)
+        indptr = np.concatenate(([0], np.cumsum(counts)))
 
-        i = 0
-        while i < peaks.size:
-            j = i + 1
-            while j < peaks.size:
-                diff = peaks[j] - peaks[i]
-                if diff <= self.fsa_file.max_ladder_trace_distance:
-                    G.add_edge(peaks[i], peaks[j], length=diff)
-                j += 1
-            i += 1
+        # expand each row's run i+1 .. upper[i] without a Python loop
+        rows = np.repeat(np.arange(n), counts)
+        offsets = np.arange(indptr[-1]) - np.repeat(indptr[:-1], counts)
+        indices = rows + 1 + offsets
 
-        return G
+        return _PeakGraph(peaks, indptr, indices)
 
-    def generate_combinations(self, graph):
+    def generate_combinations(self, graph: _PeakGraph):
         """
-        Generates combinations of nodes from a given directed acyclic graph (DAG)
-        that satisfy certain conditions.
+        Generates combinations of nodes from the peak DAG that satisfy
+        certain conditions.
 
         Parameters:
-        graph (networkx.DiGraph): a DAG representing a state machine
+        graph (_PeakGraph): the CSR peak DAG
 
         Returns:
         A numpy array representing a sequence of nodes that satisfies the
         conditions of the DAG.
         """
-
-        # Get start nodes that have zero in-degree
-        start_nodes = [node for node in graph.nodes if graph.in_degree(node) == 0]
-
-        # Get end nodes that have zero out-degree
-        end_nodes = [node for node in graph.nodes if graph.out_degree(node) == 0]
-        if len(start_nodes) == 0 or len(end_nodes) == 0:
+        indptr, indices = graph.indptr, graph.indices
+        n = graph.peaks.size
+        if n == 0:
             raise ValueError("Graph does not have start or end nodes")
 
-        # Get all simple paths from start node to end node
-        all_paths = []
-        for start_node in start_nodes:
-            for end_node in end_nodes:
-                paths = nx.all_simple_paths(graph, start_node, end_node)
-                all_paths.extend(paths)
-
-        if len(all_paths) == 0:
+        # Every length-ref_count window of a start-to-end path is exactly a
+        # length-ref_count chain in the DAG (any chain extends backwards to
+        # an in-degree-0 node and forwards to an out-degree-0 node), so a
+        # depth-limited DFS from every node emits each candidate once.
+        # Overlapping maximal paths no longer produce duplicate windows,
+        # which kept the old enumeration exponential
+        ref_count = self.fsa_file.ref_count
+        peaks = graph.peaks
+        found_any = False
+
+        # longest chain starting at each node, by DP in reverse
+        # topological order (sorted peaks are their own topological
+        # order); branches that cannot reach ref_count nodes are pruned
+        # before the DFS descends into them
+        longest = np.ones(n, dtype=np.int64)
+        for node in range(n - 1, -1, -1):
+            successors = indices[indptr[node] : indptr[node + 1]]
+            if successors.size:
+                longest[node] = 1 + longest[successors].max()
+
+        def viable(node: int, have: int):
+            successors = indices[indptr[node] : indptr[node + 1]]
+            return iter(successors[longest[successors] >= ref_count - have])
+
+        for first in np.flatnonzero(longest >= ref_count):
+            path = [first]
+            stack = [viable(first, 1)]
+            while stack:
+                if len(path) == ref_count:
+                    found_any = True
+                    yield peaks[path]
+                    path.pop()
+                    stack.pop()
+                    continue
+                successor = next(stack[-1], None)
+                if successor is None:
+                    stack.pop()
+                    path.pop()
+                    continue
+                path.append(successor)
+                stack.append(viable(successor, len(path)))
+
+        if not found_any:
             raise ValueError("No paths found from start to end nodes")
 
-        # Generate combinations of nodes that satisfy certain conditions
-        for p_arr in all_paths:
-            for i in range(0, len(p_arr) - self.fsa_file.ref_count + 1):
-                yield np.array(p_arr[i : i + self.fsa_file.ref_count])
-
     def get_best_fit(self, combinations, method="2nd_derivative"):
         """
         Calculates the best fit for a given set of combinations using a specified method.
@@ -161,31 +260,49 @@ class PeakLadderAssigner:
         A numpy array representing the combination of nodes with the best fit.
         """
 
-        # Create an empty dataframe to store combinations and scores
-        df = pd.DataFrame()
+        # Stack the combinations into one (N, ref_count) array and score
+        # them in a single vectorized pass instead of per combination
+        combs = np.vstack(list(combinations))
 
-        # Store the combinations in the dataframe
-        df["combination"] = list(combinations)
-
-        # Calculate the score for each combination using the specified method
         if method == "2nd_derivative":
-            df["score"] = np.vectorize(self._max_spline_second_derivative_score)(
-                df["combination"]
-            )
+            scores = self._spline_second_derivative_scores(combs)
 
         if method == "first_derivative":
-            df["score"] = np.vectorize(self._max_first_derivative_score)(
-                df["combination"]
-            )
+            scores = self._first_derivative_scores(combs)
+
+        # Return the best combination (i.e., the one with the lowest score)
+        return combs[np.argmin(scores)]
+
+    def _spline_second_derivative_scores(self, combs: np.ndarray) -> np.ndarray:
+        """
+        Batch version of _max_spline_second_derivative_score: the spline
+        knot system only depends on the fixed reference sizes, so one
+        banded solve scores every combination at once.
+        """
+        if self._spline_banded.shape[1] == 0:
+            return np.zeros(len(combs))
+
+        y = combs.astype(np.float32)
+        h = self._ref_diff
+        rhs = 6.0 * (
+            (y[:, 2:] - y[:, 1:-1]) / h[1:] - (y[:, 1:-1] - y[:, :-2]) / h[:-1]
+        )
+        second_derivatives = solve_banded((1, 1), self._spline_banded, rhs.T)
+
+        return np.abs(second_derivatives).max(axis=0)
 
-        # Sort the dataframe by score in ascending order
-        df = df.sort_values(by="score", ascending=True)
+    def _first_derivative_scores(self, combs: np.ndarray) -> np.ndarray:
+        """
+        Batch version of _max_first_derivative_score across the first axis
+        of a (N, ref_count) combination array.
+        """
+        low = combs[:, :1].astype(np.float32)
+        high = combs[:, -1:].astype(np.float32)
+        scaled = (combs - low) / (high - low) * self._ref_span + self._ref_lo
 
-        # Get the best combination (i.e., the one with the lowest score)
-        best = df.head(1)
+        diff_intervals = np.diff(scaled, axis=1) - self._ref_diff
 
-        # Return the best combination as a numpy array
-        return best.combination.squeeze()
+        return np.abs(np.gradient(diff_intervals, axis=1)).max(axis=1)
 
     @staticmethod
     def _polynomial_model_inv_r2_score(ladder: np.array, comb: np.array) -> float:
@@ -234,9 +351,13 @@ class PeakLadderAssigner:
           maximum deviation.
 
         """
-        # calculate interval lengths and scaled comb height intervals
+        # calculate interval lengths and scaled comb height intervals;
+        # the affine map is inlined instead of paying sklearn's
+        # minmax_scale validation per call
+        c_min, c_max = comb.min(), comb.max()
+        c_scaled = (comb - c_min) * ((ladder[-1] - ladder[0]) / (c_max - c_min)) + ladder[0]
         l_intervals = np.diff(ladder)
-        c_intervals = np.diff(minmax_scale(comb, feature_range=(ladder[0], ladder[-1])))
+        c_intervals = np.diff(c_scaled)
 
         # calculate fractional deviation between interval lengths and scaled comb height intervals
         frac_deviation = np.abs(l_intervals - c_intervals) / l_intervals
@@ -256,13 +377,13 @@ class PeakLadderAssigner:
             float: The maximum first derivative score for the given combination of features.
         """
         # Scale the combination to the range of reference sizes
-        comb_scaled = minmax_scale(
-            combination,
-            feature_range=(self.fsa_file.ref_sizes[0], self.fsa_file.ref_sizes[-1]),
-        )
+        c_min, c_max = combination.min(), combination.max()
+        comb_scaled = (combination - c_min) * (
+            self._ref_span / (c_max - c_min)
+        ) + self._ref_lo
 
         # Calculate the differences between consecutive values of the scaled combination and the reference sizes
-        diff_intervals = np.diff(comb_scaled) - np.diff(self.fsa_file.ref_sizes)
+        diff_intervals = np.diff(comb_scaled) - self._ref_diff
 
         # Calculate the absolute gradient of the differences between consecutive values
         abs_diff_intervals_gradient = np.abs(np.gradient(diff_intervals))
@@ -288,13 +409,13 @@ class PeakLadderAssigner:
 
         """
         # Scale the combination to match the range of reference sizes.
-        comb_scaled = minmax_scale(
-            combination,
-            feature_range=(self.fsa_file.ref_sizes[0], self.fsa_file.ref_sizes[-1]),
-        )
+        c_min, c_max = combination.min(), combination.max()
+        comb_scaled = (combination - c_min) * (
+            self._ref_span / (c_max - c_min)
+        ) + self._ref_lo
 
         # Calculate the difference between the scaled combination and reference sizes.
-        diff_intervals = np.diff(comb_scaled) - np.diff(self.fsa_file.ref_sizes)
+        diff_intervals = np.diff(comb_scaled) - self._ref_diff
 
         # Calculate the absolute second derivative of the difference intervals.
         abs_second_derivative = np.abs(np.gradient(np.gradient(diff_intervals)))
@@ -307,7 +428,8 @@ class PeakLadderAssigner:
 
     def _max_spline_second_derivative_score(self, combination: np.ndarray) -> float:
         """
-        Calculates the maximum absolute value of the second derivative of a given combination of values using a UnivariateSpline.
+        Calculates the maximum absolute value of the second derivative of a given combination of values
+        using a natural cubic spline through the reference sizes.
 
         Args:
         - self (object): an instance of the class containing the function
@@ -317,13 +439,9 @@ class PeakLadderAssigner:
         - max_value (float): the maximum absolute value of the second derivative of the given combination
 
         """
-        # create a UnivariateSpline object using the reference sizes and the given combination
-        spl = UnivariateSpline(self.fsa_file.ref_sizes, combination, s=0)
-
-        # calculate the second derivative of the spline
-        der2 = spl.derivative(n=2)
-
-        # evaluate the second derivative at each reference size and return the maximum absolute value
-        max_value = max(abs(der2(self.fsa_file.ref_sizes)))
-
-        return max_value
+        # solve the spline knot system directly instead of constructing a
+        # UnivariateSpline per combination
+        return _natural_spline_max_d2(
+            np.asarray(self.fsa_file.ref_sizes, dtype=np.float64),
+            np.asarray(combination, dtype=np.float64),
+        )
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import altair as alt
 
@@ -6,26 +7,29 @@ def make_fsa_data_df(fsa, ladder: bool = False) -> pd.DataFrame:
     data = ["DATA1", "DATA2", "DATA3", "DATA4"]
     if ladder:
         data.append("DATA205")
-    dfs = []
-    for d in data:
-        df = (
-            pd.DataFrame()
-            .assign(data=fsa.fsa[d])
-            .assign(channel=d)
-            .assign(time=lambda x: range(x.shape[0]))
-        )
-        dfs.append(df)
-    return pd.concat(dfs)
+    # one frame built from stacked channel arrays instead of one
+    # DataFrame per channel plus a concat
+    arrays = [np.asarray(fsa.fsa[d]) for d in data]
+    lengths = [arr.size for arr in arrays]
+    return pd.DataFrame(
+        {
+            "data": np.concatenate(arrays),
+            "channel": np.repeat(data, lengths),
+            "time": np.concatenate([np.arange(n) for n in lengths]),
+        }
+    )
 
 
 def plot_fsa_data(fsa: str, ladder: bool = False) -> list:
     alt.data_transformers.disable_max_rows()
     df = make_fsa_data_df(fsa, ladder)
 
+    # one grouping pass; each chart embeds only its channel's rows, so a
+    # full-frame filter per channel was pure copying
     plots = []
-    for channel in df.channel.unique():
+    for channel, channel_df in df.groupby("channel", sort=False):
         plot = (
-            alt.Chart(df.loc[lambda x: x.channel == channel])
+            alt.Chart(channel_df)
             .mark_line()
             .encode(
                 alt.X("time:Q", title="Time"),
@@ -1,3 +1,5 @@
+from functools import cached_property
+
 import matplotlib.pyplot as plt
 import matplotlib
 import numpy as np
@@ -9,7 +11,7 @@ class PlotLadder:
     def __init__(self, model: FitLadderModel) -> None:
         self.model = model
 
-    @property
+    @cached_property
     def plot_ladder_peaks(self) -> matplotlib.figure.Figure:
         trace = self.model.fsa_file.size_standard
         best_combination = self.model.best_combination
@@ -31,7 +33,7 @@ class PlotLadder:
         plt.close()
         return fig_ladder_peaks
 
-    @property
+    @cached_property
     def plot_model_fit(self):
 
         ladder_size = self.model.fsa_file.ref_sizes
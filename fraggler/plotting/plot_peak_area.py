@@ -1,52 +1,120 @@
 from fraggler.applications.peak_area_multiplex import PeakAreaDeMultiplex
-import matplotlib.pyplot as plt
+from joblib import Parallel, delayed
+from matplotlib.figure import Figure
 import numpy as np
 
 
 class PlotPeakArea:
     def __init__(self, peak_area: PeakAreaDeMultiplex):
         self.peak_area = peak_area
+        # one figure reused across assays; cleared per call instead of
+        # allocating and tearing down a 20x10in Agg canvas per assay.
+        # Figure() stays outside pyplot, so nothing leaks into its state
+        self._fig = Figure(figsize=(20, 10))
 
     def plot_areas(self, peak_finding_model: str, assay_number: int):
-
         self.peak_area.fit_assay_peaks(peak_finding_model, assay_number)
 
-        fig_areas, axs = plt.subplots(
-            1, len(self.peak_area.fit_df), sharey=True, figsize=(20, 10)
+        fig_areas = self._fig
+        fig_areas.clear()
+        self._draw(
+            fig_areas,
+            self.peak_area.fit_df,
+            self.peak_area.fit_params,
+            self.peak_area.quotient,
         )
+        return fig_areas
 
-        # if there is only one peak
-        if len(self.peak_area.fit_df) == 1:
-            axs.plot(
-                self.peak_area.fit_df[0].basepairs, self.peak_area.fit_df[0].peaks, "o"
-            )
-            axs.plot(
-                self.peak_area.fit_df[0].basepairs, self.peak_area.fit_df[0].fitted
-            )
-            axs.set_title(
-                f"Peak 1 area: {self.peak_area.fit_params[0]['amplitude']: .1f}"
+    def plot_all_areas(self, peak_finding_model: str) -> list[Figure]:
+        """
+        Figures for every assay, in assay order. The fits run serially
+        because they mutate shared state on the PeakAreaDeMultiplex (and
+        are already parallel per peak); drawing only reads the snapshots,
+        so the figures render across threads on their own canvases.
+        """
+        snapshots = []
+        for assay_number in self.peak_area:
+            self.peak_area.fit_assay_peaks(peak_finding_model, assay_number)
+            snapshots.append(
+                (
+                    self.peak_area.fit_df,
+                    self.peak_area.fit_params,
+                    self.peak_area.quotient,
+                )
             )
-            axs.grid()
-        # if more than one peak
-        else:
-            for i, ax in enumerate(axs):
-                ax.plot(
-                    self.peak_area.fit_df[i].basepairs,
-                    self.peak_area.fit_df[i].peaks,
-                    "o",
+
+        def render(fit_df, fit_params, quotient):
+            fig = Figure(figsize=(20, 10))
+            self._draw(fig, fit_df, fit_params, quotient)
+            return fig
+
+        return Parallel(n_jobs=-1, prefer="threads")(
+            delayed(render)(*snapshot) for snapshot in snapshots
+        )
+
+    def plot_all_areas_grid(self, peak_finding_model: str) -> Figure:
+        """
+        All assays drawn into one figure, one row per assay, instead of a
+        figure per assay: one canvas init and one PNG payload in the
+        saved report regardless of assay count.
+        """
+        snapshots = []
+        for assay_number in self.peak_area:
+            self.peak_area.fit_assay_peaks(peak_finding_model, assay_number)
+            snapshots.append(
+                (
+                    self.peak_area.fit_df,
+                    self.peak_area.fit_params,
+                    self.peak_area.quotient,
                 )
-                ax.plot(
-                    self.peak_area.fit_df[i].basepairs, self.peak_area.fit_df[i].fitted
+            )
+
+        n_assays = len(snapshots)
+        fig = Figure(figsize=(20, 5 * n_assays), constrained_layout=True)
+        grid = fig.add_gridspec(n_assays, 1)
+
+        for row, (fit_df, fit_params, quotient) in enumerate(snapshots):
+            # each assay gets its own row with one column per peak,
+            # y-shared within the row like the single-assay figure
+            sub = grid[row].subgridspec(1, len(fit_df))
+            axes = []
+            for i in range(len(fit_df)):
+                ax = fig.add_subplot(
+                    sub[0, i], sharey=axes[0] if axes else None
                 )
+                axes.append(ax)
+                ax.plot(fit_df[i].basepairs, fit_df[i].peaks, "o")
+                ax.plot(fit_df[i].basepairs, fit_df[i].fitted)
                 ax.set_title(
-                    f"Peak {i + 1} area: {self.peak_area.fit_params[i]['amplitude']: .1f}"
+                    f"Peak {i + 1} area: {fit_params[i]['amplitude']: .1f}"
                 )
                 ax.grid()
+            axes[0].set_ylabel(
+                f"Assay {row + 1}\nQuotient: {quotient: .2f}", fontsize="large"
+            )
+
+        fig.legend(["Raw data", "Model"])
+        fig.supxlabel("basepairs")
+        fig.supylabel("intensity")
+        return fig
+
+    @staticmethod
+    def _draw(fig_areas, fit_df, fit_params, quotient) -> None:
+        # squeeze=False keeps a 2D axes array so one and many peaks share
+        # the same loop
+        axs = fig_areas.subplots(1, len(fit_df), sharey=True, squeeze=False)
 
-        fig_areas.suptitle(f"Quotient: {self.peak_area.quotient: .2f}")
+        for i, ax in enumerate(axs[0]):
+            ax.plot(
+                fit_df[i].basepairs,
+                fit_df[i].peaks,
+                "o",
+            )
+            ax.plot(fit_df[i].basepairs, fit_df[i].fitted)
+            ax.set_title(f"Peak {i + 1} area: {fit_params[i]['amplitude']: .1f}")
+            ax.grid()
+
+        fig_areas.suptitle(f"Quotient: {quotient: .2f}")
         fig_areas.legend(["Raw data", "Model"])
         fig_areas.supxlabel("basepairs")
         fig_areas.supylabel("intensity")
-        plt.close()
-
-        return fig_areas
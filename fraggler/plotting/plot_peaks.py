@@ -11,9 +11,12 @@ class PlotPeaks:
     def plot_peaks(self):
         fig_peaks = plt.figure(figsize=(20, 10))
 
-        df = self.peaks.peaks_dataframe.loc[
-            lambda x: x.basepairs > self.peaks.peak_information.basepairs.min() - 10
-        ].loc[lambda x: x.basepairs < self.peaks.peak_information.basepairs.max() + 10]
+        # one mask, one copy; the chained .loc[lambda] filters each
+        # materialized a full intermediate frame
+        basepairs = self.peaks.peaks_dataframe.basepairs
+        low = self.peaks.peak_information.basepairs.min() - 10
+        high = self.peaks.peak_information.basepairs.max() + 10
+        df = self.peaks.peaks_dataframe.loc[(basepairs > low) & (basepairs < high)]
 
         plt.plot(df.basepairs, df.peaks)
         plt.plot(
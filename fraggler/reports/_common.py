@@ -0,0 +1,94 @@
+"""
+Shared building blocks for the report modules.
+"""
+
+import functools
+import io
+
+import itables
+import matplotlib.pyplot as plt
+import pandas as pd
+import panel as pn
+
+
+def datatable_pane(df: pd.DataFrame, name: str) -> pn.pane.HTML:
+    """
+    Static DataTable HTML for a saved report. Much lighter than a
+    pn.widgets.Tabulator: the JS runtime comes from a shared CDN asset
+    and panel only has to serialize a plain HTML pane, not a widget tree.
+    """
+    return pn.pane.HTML(
+        itables.to_html_datatable(df, pageLength=15, scrollX=True, connected=True),
+        name=name,
+        sizing_mode="stretch_width",
+    )
+
+
+def static_png_pane(fig, name: str, dpi: int = 100) -> pn.pane.PNG:
+    """
+    Serialize a matplotlib figure (or a zero-argument callable producing
+    one) to PNG bytes for embedding. Reports are saved once as static
+    HTML, so pre-rendering gives exactly one render per figure instead
+    of one per layout update, and the live figure is released right away.
+    """
+    if callable(fig):
+        fig = fig()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return pn.pane.PNG(buffer.getvalue(), name=name)
+
+
+@functools.lru_cache(maxsize=64)
+def _header_template(
+    text: str,
+    bg_color: str,
+    height: int,
+    fontsize: str,
+    textalign: str,
+) -> pn.pane.Markdown:
+    """
+    One Markdown pane per unique header signature; the section headers
+    repeat across every report, so call sites clone the cached template
+    instead of constructing a fresh pane each time.
+    """
+    return pn.pane.Markdown(
+        f"""
+        {text}
+        """,
+        background=bg_color,
+        height=height,
+        margin=10,
+        style={
+            "color": "white",
+            "padding": "10px",
+            "text-align": f"{textalign}",
+            "font-size": f"{fontsize}",
+        },
+    )
+
+
+def header(
+    text: str,
+    bg_color: str = "#04c273",
+    height: int = 300,
+    fontsize: str = "px20",
+    textalign: str = "center",
+):
+    """
+    Template for markdown header like block
+    """
+    return _header_template(text, bg_color, height, fontsize, textalign).clone()
+
+
+def make_header(name: str, date: str) -> pn.pane.Markdown:
+    return header(
+        text=f"""
+        # Fragment Analysis Report
+        ## Report of {name}
+        ## Date: {date}
+        """,
+        fontsize="20px",
+        bg_color="#03a1fc",
+        height=250,
+    )
@@ -15,317 +15,147 @@ from ..plotting.plot_channels import plot_fsa_data
 from ..plotting.plot_peaks import PlotPeaks
 from ..plotting.plot_ladder import PlotLadder
 from ..plotting.plot_peak_area import PlotPeakArea
+from ._common import datatable_pane, header, make_header, static_png_pane
 
 
-pn.extension("tabulator")
-pn.extension("vega", sizing_mode="stretch_width", template="fast")
-pn.widgets.Tabulator.theme = "modern"
+_extensions_loaded = False
 
+# layout nodes with no per-file state are safe to share by reference
+# across saved reports; one instance serves every report this process writes
+_DIVIDER = pn.layout.Divider()
 
-def header(
-    text: str,
-    bg_color: str = "#04c273",
-    height: int = 300,
-    fontsize: str = "px20",
-    textalign: str = "center",
-):
+
+def _load_extensions() -> None:
     """
-    Template for markdown header like block
+    Register the panel extensions on first report, not at import; pulling
+    in this module for one of the generator functions should not pay for
+    the vega JS bundle.
     """
-    return pn.pane.Markdown(
-        f"""
-        {text}
-        """,
-        background=bg_color,
-        height=height,
-        margin=10,
-        style={
-            "color": "white",
-            "padding": "10px",
-            "text-align": f"{textalign}",
-            "font-size": f"{fontsize}",
-        },
-    )
+    global _extensions_loaded
+    if _extensions_loaded:
+        return
+    pn.extension("vega", sizing_mode="stretch_width", template="fast")
+    _extensions_loaded = True
 
 
-def make_header(name: str, date: str) -> pn.pane.Markdown:
-    return header(
-        text=f"""
-        # Fragment Analysis Report
-        ## Report of {name}
-        ## Date: {date}
-        """,
-        fontsize="20px",
-        bg_color="#03a1fc",
-        height=250,
+def _section(title: str, *panes) -> pn.Column:
+    """
+    One report section: a green section header plus a tab per pane. The
+    section structure is identical across files, so everything reusable
+    (the header templates) comes from the _common cache and only the leaf
+    panes are built per file.
+    """
+    return pn.Column(
+        header(text=title, bg_color="#04c273", height=80, textalign="left"),
+        pn.Tabs(*panes),
     )
 
 
-def generate_peak_report(fraggler: FragglerPeak) -> pn.layout.base.Column:
-    ### ----- Raw Data ----- ###
-    channel_header = header(
-        text=f"## Plot of channels",
-        bg_color="#04c273",
-        height=80,
-        textalign="left",
-    )
-    # PLOT
-    channel_tab = pn.Tabs()
-    for plot, name in plot_fsa_data(fraggler.fsa):
-        pane = pn.pane.Vega(plot.interactive(), sizing_mode="stretch_both", name=name)
-        channel_tab.append(pane)
-
-    channels_section = pn.Column(channel_header, channel_tab)
-
-    ### ----- Peaks ----- ###
-    peaks_header = header(
-        text=f"## Plot of Peaks",
-        bg_color="#04c273",
-        height=80,
-        textalign="left",
-    )
+def _channels_section(fsa: FsaFile) -> pn.Column:
+    panes = [
+        pn.pane.Vega(plot.interactive(), sizing_mode="stretch_both", name=name)
+        for plot, name in plot_fsa_data(fsa)
+    ]
+    return _section("## Plot of channels", *panes)
 
-    # PLOT
-    peaks_plot = PlotPeaks(fraggler.peaks).plot_peaks
-    peaks_pane = pn.pane.Matplotlib(peaks_plot, name="Peaks")
 
-    # Section
-    peaks_tab = pn.Tabs(
-        peaks_pane,
-    )
-    peaks_section = pn.Column(peaks_header, peaks_tab)
-
-    ### ----- Ladder Information ----- ###
-    ladder_header = header(
-        text=f"## Information about the ladder",
-        bg_color="#04c273",
-        height=80,
-        textalign="left",
-    )
-    # Ladder peak plot
-    ladder_plot = PlotLadder(fraggler.model)
-    ladder_peak_plot = pn.pane.Matplotlib(
-        ladder_plot.plot_ladder_peaks,
-        name="Ladder Peak Plot",
-    )
-    # Ladder Correlation
-    ladder_correlation_plot = pn.pane.Matplotlib(
-        ladder_plot.plot_model_fit,
-        name="Ladder Correlation Plot",
+def _ladder_section(model) -> pn.Column:
+    ladder_plot = PlotLadder(model)
+    return _section(
+        "## Information about the ladder",
+        static_png_pane(ladder_plot.plot_ladder_peaks, name="Ladder Peak Plot"),
+        static_png_pane(ladder_plot.plot_model_fit, name="Ladder Correlation Plot"),
     )
 
-    # Section
-    ladder_tab = pn.Tabs(
-        ladder_peak_plot,
-        ladder_correlation_plot,
+
+def _assemble(head, sections) -> pn.layout.base.Column:
+    return pn.Column(
+        head,
+        _DIVIDER,
+        pn.Tabs(*sections, tabs_location="left"),
     )
-    ladder_section = pn.Column(ladder_header, ladder_tab)
-
-    ### ----- Peaks dataframe ----- ###
-    dataframe_header = header(
-        text=f"## Peaks Table",
-        bg_color="#04c273",
-        height=80,
-        textalign="left",
+
+
+def generate_peak_report(fraggler: FragglerPeak) -> pn.layout.base.Column:
+    _load_extensions()
+
+    channels_section = _channels_section(fraggler.fsa)
+
+    peaks_plot = PlotPeaks(fraggler.peaks).plot_peaks
+    peaks_section = _section(
+        "## Plot of Peaks", static_png_pane(peaks_plot, name="Peaks")
     )
-    # Create dataframe
+
+    ladder_section = _ladder_section(fraggler.model)
+
     df = fraggler.peaks.peak_information.assign(file_name=fraggler.fsa.file_name)[
         ["file_name", "basepairs", "peaks"]
     ].rename(columns={"peaks": "peak_height"})
-    # DataFrame Tabulator
-    peaks_df_tab = pn.widgets.Tabulator(
-        df,
-        layout="fit_columns",
-        pagination="local",
-        page_size=15,
-        show_index=False,
-        name="Peaks Table",
+    dataframe_section = _section(
+        "## Peaks Table",
+        datatable_pane(df.reset_index(drop=True), name="Peaks Table"),
     )
 
-    # Section
-    dataframe_tab = pn.Tabs(peaks_df_tab)
-    dataframe_section = pn.Column(dataframe_header, dataframe_tab)
-
-    ### CREATE REPORT ###
-
-    file_name = fraggler.fsa.file_name
-    date = fraggler.fsa.fsa["RUND1"]
-    head = make_header(file_name, date)
-
-    all_tabs = pn.Tabs(
-        ("Channels", channels_section),
-        ("Peaks", peaks_section),
-        ("Ladder", ladder_section),
-        ("Peaks Table", dataframe_section),
-        tabs_location="left",
-    )
-    report = pn.Column(
+    head = make_header(fraggler.fsa.file_name, fraggler.fsa.run_date)
+    return _assemble(
         head,
-        pn.layout.Divider(),
-        all_tabs,
+        [
+            ("Channels", channels_section),
+            ("Peaks", peaks_section),
+            ("Ladder", ladder_section),
+            ("Peaks Table", dataframe_section),
+        ],
     )
 
-    return report
-
 
 def generate_area_report(
     fraggler: FragglerArea,
     peak_model: str = "gauss",
 ) -> pn.layout.base.Column:
+    _load_extensions()
 
-    ### ----- Raw Data ----- ###
-    channel_header = header(
-        text=f"## Plot of channels",
-        bg_color="#04c273",
-        height=80,
-        textalign="left",
-    )
-    # PLOT
-    channel_tab = pn.Tabs()
-    for plot, name in plot_fsa_data(fraggler.fsa):
-        pane = pn.pane.Vega(plot.interactive(), sizing_mode="stretch_both", name=name)
-        channel_tab.append(pane)
-
-    channels_section = pn.Column(channel_header, channel_tab)
-
-    ### ----- Peaks ----- ###
-    peaks_header = header(
-        text=f"## Plot of Peaks",
-        bg_color="#04c273",
-        height=80,
-        textalign="left",
-    )
+    channels_section = _channels_section(fraggler.fsa)
 
-    # PLOT
     peaks_plot = PlotPeaks(fraggler.peaks).plot_peaks
-    peaks_pane = pn.pane.Matplotlib(peaks_plot, name="Peaks")
-
-    # Section
-    peaks_tab = pn.Tabs(
-        peaks_pane,
-    )
-    peaks_section = pn.Column(peaks_header, peaks_tab)
-
-    ### ----- Ladder Information ----- ###
-    ladder_header = header(
-        text=f"## Information about the ladder",
-        bg_color="#04c273",
-        height=80,
-        textalign="left",
-    )
-    # Ladder peak plot
-    ladder_plot = PlotLadder(fraggler.model)
-    ladder_peak_plot = pn.pane.Matplotlib(
-        ladder_plot.plot_ladder_peaks,
-        name="Ladder Peak Plot",
-    )
-    # Ladder Correlation
-    ladder_correlation_plot = pn.pane.Matplotlib(
-        ladder_plot.plot_model_fit,
-        name="Ladder Correlation Plot",
+    peaks_section = _section(
+        "## Plot of Peaks", static_png_pane(peaks_plot, name="Peaks")
     )
 
-    # Section
-    ladder_tab = pn.Tabs(
-        ladder_peak_plot,
-        ladder_correlation_plot,
-    )
-    ladder_section = pn.Column(ladder_header, ladder_tab)
-
-    ### ----- Areas Information ----- ###
-    areas_header = header(
-        text=f"## Peak Areas",
-        bg_color="#04c273",
-        height=80,
-        textalign="left",
-    )
-    areas_tab = pn.Tabs()
+    ladder_section = _ladder_section(fraggler.model)
+
     area_plots = PlotPeakArea(fraggler.areas)
-    for assay in fraggler.areas:
-        plot = area_plots.plot_areas(peak_model, assay)
-        name = f"Assay {assay + 1}"
-        plot_pane = pn.pane.Matplotlib(plot, name=name)
-        areas_tab.append(plot_pane)
-
-    # Section
-    areas_section = pn.Column(areas_header, areas_tab)
-
-    ### ----- Peaks DataFrame ----- ###
-    dataframe_header = header(
-        text=f"## Peaks Table",
-        bg_color="#04c273",
-        height=80,
-        textalign="left",
+    areas_section = _section(
+        "## Peak Areas",
+        static_png_pane(
+            area_plots.plot_all_areas_grid(peak_model), name="Peak Areas"
+        ),
     )
-    # Create dataframe
-    df = fraggler.areas.assays_dataframe(peak_model)
 
-    # DataFrame Tabulator
-    peaks_df_tab = pn.widgets.Tabulator(
-        df,
-        layout="fit_columns",
-        pagination="local",
-        page_size=15,
-        show_index=False,
-        name="Peaks Table",
+    df = fraggler.areas.assays_dataframe(peak_model)
+    dataframe_section = _section(
+        "## Peaks Table",
+        datatable_pane(df.reset_index(drop=True), name="Peaks Table"),
     )
 
-    # Section
-    dataframe_tab = pn.Tabs(peaks_df_tab)
-    dataframe_section = pn.Column(dataframe_header, dataframe_tab)
-
-    ### CREATE REPORT ###
-
-    file_name = fraggler.fsa.file_name
-    date = fraggler.fsa.fsa["RUND1"]
-    head = make_header(file_name, date)
-
-    all_tabs = pn.Tabs(
-        ("Channels", channels_section),
-        ("Peaks", peaks_section),
-        ("Ladder", ladder_section),
-        ("Areas", areas_section),
-        ("Peak Table", dataframe_section),
-        tabs_location="left",
-    )
-    report = pn.Column(
+    head = make_header(fraggler.fsa.file_name, fraggler.fsa.run_date)
+    return _assemble(
         head,
-        pn.layout.Divider(),
-        all_tabs,
+        [
+            ("Channels", channels_section),
+            ("Peaks", peaks_section),
+            ("Ladder", ladder_section),
+            ("Areas", areas_section),
+            ("Peak Table", dataframe_section),
+        ],
     )
 
-    return report
-
 
 def generate_no_peaks_report(fsa: FsaFile):
-    channel_header = header(
-        text=f"## Plot of channels",
-        bg_color="#04c273",
-        height=80,
-        textalign="left",
-    )
-    # PLOT
-    channel_tab = pn.Tabs()
-    for plot, name in plot_fsa_data(fsa):
-        pane = pn.pane.Vega(plot.interactive(), sizing_mode="stretch_both", name=name)
-        channel_tab.append(pane)
-    channels_section = pn.Column(channel_header, channel_tab)
-
-    ### CREATE REPORT ###
-    file_name = fsa.file_name
-    date = fsa.fsa["RUND1"]
+    _load_extensions()
+
+    channels_section = _channels_section(fsa)
+
     head = header(
         "# No peaks could be generated. Please look at the raw data.", height=100
     )
-
-    all_tabs = pn.Tabs(
-        ("Channels", channels_section),
-        tabs_location="left",
-    )
-    report = pn.Column(
-        head,
-        pn.layout.Divider(),
-        all_tabs,
-    )
-
-    return report
+    return _assemble(head, [("Channels", channels_section)])
@@ -1,5 +1,8 @@
-from dataclasses import dataclass
+import concurrent.futures
+import functools
 import logging
+import os
+from dataclasses import dataclass
 from pathlib import Path
 
 from ..applications.peak_area_multiplex import PeakAreaDeMultiplex
@@ -9,6 +12,44 @@ from ..ladder_fitting.peak_ladder_assigner import PeakLadderAssigner
 from ..ladder_fitting.fit_ladder_model import FitLadderModel
 
 
+@functools.lru_cache(maxsize=64)
+def _cached_ladder_model(
+    path: str,
+    mtime_ns: int,
+    ladder: str,
+    trace_channel: str,
+    size_standard_channel: str | None,
+    min_height: int,
+) -> tuple[FsaFile, PeakLadderAssigner, FitLadderModel]:
+    """
+    FsaFile, ladder assignment and ladder fit depend only on the file
+    contents and the ladder parameters — not on the peak-finding knobs —
+    so re-runs with different peak_height/min_ratio/cutoff reuse them.
+    Keyed by mtime so an updated file invalidates the entry.
+    """
+    fsa = FsaFile(
+        path,
+        ladder,
+        min_height=min_height,
+        trace_channel=trace_channel,
+        size_standard_channel=size_standard_channel,
+    )
+    ladder_assigner = PeakLadderAssigner(fsa)
+    model = FitLadderModel(ladder_assigner)
+    return fsa, ladder_assigner, model
+
+
+@dataclass
+class FragglerFailure:
+    """
+    Returned when a file cannot be processed; keeps the parsed FsaFile
+    (when parsing succeeded) so report generation does not re-read the file.
+    """
+
+    file_name: str
+    fsa: FsaFile | None = None
+
+
 @dataclass
 class FragglerPeak:
     fsa: FsaFile
@@ -36,18 +77,19 @@ def make_fraggler_peak(
     custom_peaks: str | None,
     size_standard_channel: str | None,
     distance_between_assays: int,
-) -> FragglerPeak | str:
+) -> FragglerPeak | FragglerFailure:
     file = Path(file)
+    fsa = None
     try:
-        fsa = FsaFile(
-            file,
+        stat = file.stat()
+        fsa, ladder_assigner, model = _cached_ladder_model(
+            str(file.resolve()),
+            stat.st_mtime_ns,
             ladder,
-            min_height=min_height,
-            trace_channel=trace_channel,
-            size_standard_channel=size_standard_channel,
+            trace_channel,
+            size_standard_channel,
+            min_height,
         )
-        ladder_assigner = PeakLadderAssigner(fsa)
-        model = FitLadderModel(ladder_assigner)
         peaks = PeakFinder(
             model,
             min_ratio=min_ratio,
@@ -70,7 +112,50 @@ def make_fraggler_peak(
         """
         )
 
-        return file.stem
+        if fsa is None:
+            # keep the parsed raw data for the no-peaks report when only
+            # the ladder fit failed; the ABIF cache makes this cheap
+            try:
+                fsa = FsaFile(
+                    file,
+                    ladder,
+                    min_height=min_height,
+                    trace_channel=trace_channel,
+                    size_standard_channel=size_standard_channel,
+                )
+            except Exception:
+                pass
+
+        return FragglerFailure(file.stem, fsa)
+
+
+def make_fragglers_batch(
+    files: list[Path],
+    kind: str = "area",
+    workers: int | None = None,
+    **kwargs,
+) -> list[FragglerPeak | FragglerArea | FragglerFailure]:
+    """
+    Build Fraggler objects for many files across worker processes; files
+    are independent, so this scales with core count. kwargs are passed
+    through to make_fraggler_peak/make_fraggler_area. workers=1 keeps
+    everything in the current process.
+    """
+    factories = {"peak": make_fraggler_peak, "area": make_fraggler_area}
+    try:
+        factory = factories[kind]
+    except KeyError:
+        raise ValueError(f"'{kind}' is not a valid kind. Options: {list(factories)}")
+
+    if workers == 1:
+        return [factory(file, **kwargs) for file in files]
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count()
+    ) as executor:
+        return list(
+            executor.map(functools.partial(factory, **kwargs), files, chunksize=4)
+        )
 
 
 def make_fraggler_area(
@@ -84,18 +169,19 @@ def make_fraggler_area(
     size_standard_channel: str | None,
     distance_between_assays: int,
     cutoff: int,
-) -> FragglerArea | str:
+) -> FragglerArea | FragglerFailure:
     file = Path(file)
+    fsa = None
     try:
-        fsa = FsaFile(
-            file,
+        stat = file.stat()
+        fsa, ladder_assigner, model = _cached_ladder_model(
+            str(file.resolve()),
+            stat.st_mtime_ns,
             ladder,
-            min_height=min_height,
-            trace_channel=trace_channel,
-            size_standard_channel=size_standard_channel,
+            trace_channel,
+            size_standard_channel,
+            min_height,
         )
-        ladder_assigner = PeakLadderAssigner(fsa)
-        model = FitLadderModel(ladder_assigner)
         peaks = PeakFinder(
             model,
             min_ratio=min_ratio,
@@ -123,4 +209,18 @@ def make_fraggler_area(
         """
         )
 
-        return file.stem
+        if fsa is None:
+            # keep the parsed raw data for the no-peaks report when only
+            # the ladder fit failed; the ABIF cache makes this cheap
+            try:
+                fsa = FsaFile(
+                    file,
+                    ladder,
+                    min_height=min_height,
+                    trace_channel=trace_channel,
+                    size_standard_channel=size_standard_channel,
+                )
+            except Exception:
+                pass
+
+        return FragglerFailure(file.stem, fsa)
@@ -1,3 +1,8 @@
+import functools
+import hashlib
+import os
+import pickle
+import types
 from pathlib import Path
 from Bio import SeqIO
 import numpy as np
@@ -5,8 +10,74 @@ import numpy as np
 from fraggler.ladders.ladders import LADDERS
 from fraggler.utils.baseline_removal import baseline_arPLS
 
+CACHE_DIR = Path.home() / ".cache" / "fraggler"
+
+
+def _read_abif(file: Path) -> dict:
+    """
+    Read the raw ABIF record, memoized in-process and backed by an
+    on-disk cache, both keyed by the file's path, mtime and size.
+    Re-runs with different peak parameters hit the cache and skip the
+    biopython parse entirely.
+    """
+    stat = file.stat()
+    return _read_abif_cached(str(file.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=32)
+def _read_abif_cached(path: str, mtime_ns: int, size: int) -> dict:
+    key = hashlib.blake2s(f"{path}:{mtime_ns}:{size}".encode()).hexdigest()[:16]
+    cache_file = CACHE_DIR / f"{key}.pkl"
+
+    if cache_file.exists():
+        try:
+            with open(cache_file, "rb") as cached:
+                return pickle.load(cached)
+        except Exception:
+            # corrupt or truncated entry; fall through to a fresh parse
+            pass
+
+    raw = SeqIO.read(path, "abi").annotations["abif_raw"]
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # write-then-rename keeps concurrent workers from reading a
+        # half-written entry
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as out:
+            pickle.dump(raw, out, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        # caching is best effort; an unwritable cache dir is not an error
+        pass
+
+    return raw
+
 
 class FsaFile:
+    # channels the downstream plotting/reporting code still reads from
+    # self.fsa after construction
+    _KEPT_CHANNELS = ("DATA1", "DATA2", "DATA3", "DATA4", "DATA205")
+
+    __slots__ = (
+        "file",
+        "file_name",
+        "ladder",
+        "fsa",
+        "trace_channel",
+        "normalize",
+        "ref_sizes",
+        "ref_count",
+        "size_standard_channel",
+        "min_interpeak_distance",
+        "min_height",
+        "max_ladder_trace_distance",
+        "max_peak_count",
+        "size_standard",
+        "trace",
+        "metadata",
+    )
+
     def __init__(
         self,
         file: str,
@@ -38,8 +109,8 @@ class FsaFile:
         self.file = Path(file)
         self.file_name = self.file.parts[-1]
 
-        # Extract data from the sequencing file
-        self.fsa = SeqIO.read(file, "abi").annotations["abif_raw"]
+        # Extract data from the sequencing file (disk-cached between runs)
+        raw = _read_abif(self.file)
         self.ladder = ladder
         self.trace_channel = trace_channel
         self.normalize = normalize
@@ -59,15 +130,37 @@ class FsaFile:
         )
         self.max_peak_count = self.ref_count + peak_count_padding
 
+        # Convert the raw channel tuples exactly once; baseline_arPLS gets
+        # the array directly and its output is used as-is instead of being
+        # wrapped in a second full copy
+        size_standard = np.asarray(raw[self.size_standard_channel], dtype=np.float32)
+        trace = np.asarray(raw[trace_channel], dtype=np.float32)
+
+        # The raw ABIF dict holds every channel and tag in the file and
+        # easily runs to tens of MB; keep only the channels the plots read
+        # and a small metadata record so the rest can be garbage collected
+        self.metadata = types.SimpleNamespace(
+            run_date=raw.get("RUND1", ""),
+            run_time=raw.get("RUNT1", ""),
+            sample_name=raw.get("SMPL1", ""),
+        )
+        self.fsa = {
+            channel: raw[channel]
+            for channel in self._KEPT_CHANNELS
+            if channel in raw
+        }
+
         # Normalize data if requested
         if normalize:
-            self.size_standard = np.array(
-                baseline_arPLS(self.fsa[self.size_standard_channel])
-            )
-            self.trace = np.array(baseline_arPLS(self.fsa[trace_channel]))
+            self.size_standard = baseline_arPLS(size_standard)
+            self.trace = baseline_arPLS(trace)
         else:
-            self.size_standard = np.array(self.fsa[self.size_standard_channel])
-            self.trace = np.array(self.fsa[trace_channel])
+            self.size_standard = size_standard
+            self.trace = trace
+
+    @property
+    def run_date(self):
+        return self.metadata.run_date
 
     def __str__(self):
         """
@@ -1,3 +1,4 @@
+import functools
 import logging
 import pandas as pd
 import numpy as np
@@ -16,51 +17,39 @@ class WrongColumnsError(Exception):
 
 ######### -------------------- Validation functions ######### --------------------
 def is_overlapping(df: pd.DataFrame) -> bool:
-    test = (
-        df.sort_values("start")
-        .assign(intervals=lambda x: [range(y.start, y.stop) for y in x.itertuples()])
-        .explode("intervals")
-    )
-
-    if test.shape[0] != test.intervals.nunique():
-        dups = (
-            test.value_counts("intervals")
-            .reset_index()
-            .sort_values("intervals")
-            .loc[lambda x: x[0] > 1]
-            .iloc[0, 0]
-        )
+    # Sort by start and compare neighbouring intervals instead of
+    # materializing every value inside each range.
+    sorted_df = df.sort_values("start")
+    starts = sorted_df.start.to_numpy()
+    stops = sorted_df.stop.to_numpy()
+    # compare against the running maximum stop so intervals nested inside
+    # an earlier, wider one are caught too
+    overlaps = starts[1:] < np.maximum.accumulate(stops[:-1])
+
+    if overlaps.any():
+        first_overlap = int(np.argmax(overlaps))
         logging.warning(
             f"""
         Customized peaks contains overlapping ranges
-        Starting at value: {dups}
+        Starting at value: {starts[first_overlap + 1]}
         """
         )
         return True
     return False
 
 
-def has_columns(df: pd.DataFrame) -> bool:
-    columns = set(["name", "start", "stop", "amount"])
-    df_columns = set(df.columns)
+_REQUIRED_CUSTOM_PEAK_COLS = frozenset(("name", "start", "stop", "amount"))
 
-    if len(columns) != len(df_columns):
-        logging.warning(
-            f"""
-        Customized peaks table does not containg the right columns.
-        Current columns: {df_columns}
-        Needed columns: {columns}
-        """
-        )
-        return False
 
-    intersection = columns.intersection(df_columns)
-    if len(intersection) != len(df_columns):
+def has_columns(df: pd.DataFrame) -> bool:
+    df_columns = frozenset(df.columns)
+
+    if not _REQUIRED_CUSTOM_PEAK_COLS <= df_columns:
         logging.warning(
             f"""
         Customized peaks table does not containg the right columns.
-        Current columns: {df_columns}
-        Needed columns: {columns}
+        Current columns: {set(df_columns)}
+        Needed columns: {set(_REQUIRED_CUSTOM_PEAK_COLS)}
         """
         )
         return False
@@ -68,6 +57,25 @@ def has_columns(df: pd.DataFrame) -> bool:
     return True
 
 
+@functools.lru_cache(maxsize=32)
+def _validate_custom_peaks(columns: tuple, rows: tuple) -> None:
+    """
+    Validate a custom-peaks table given as hashable tuples. Batch runs
+    construct one PeakFinder per file with the same table, so the result
+    is cached; failures raise and are re-raised on every retry since
+    lru_cache does not store exceptions.
+    """
+    df = pd.DataFrame(list(rows), columns=list(columns))
+
+    # check the columns first: it is a set comparison, whereas the
+    # overlap check sorts the table and assumes start/stop exist
+    if not has_columns(df):
+        raise WrongColumnsError("Wrong columns!")
+
+    if is_overlapping(df):
+        raise OverlappingIntervalError("Overlapping intervals!")
+
+
 #### ---------------------------------------------------------------------------------- ###
 
 
@@ -88,140 +96,179 @@ class PeakFinder:
         self.peak_height = peak_height
         self.min_ratio = min_ratio
         self.distance_between_assays = distance_between_assays
-        self.custom_peaks = (
-            custom_peaks.fillna(0)
-            if isinstance(custom_peaks, pd.DataFrame)
-            else pd.read_csv(custom_peaks).fillna(0)
-            if isinstance(custom_peaks, str)
-            else None
-        )
+        if isinstance(custom_peaks, str):
+            custom_peaks = pd.read_csv(custom_peaks)
+        if isinstance(custom_peaks, pd.DataFrame):
+            # per-column defaults instead of a blanket fillna(0), which
+            # would push numeric zeros into the name column and drag the
+            # frame to object dtype; a missing amount means "keep all"
+            custom_peaks = custom_peaks.fillna({"name": "", "amount": 0})
+            if "amount" in custom_peaks.columns:
+                custom_peaks = custom_peaks.astype({"amount": np.int64})
+            self.custom_peaks = custom_peaks
+        else:
+            self.custom_peaks = None
+
+        # Filter where to start search for the peaks, computed once and
+        # reused by both the agnostic and the customized path. basepairs
+        # is monotone after the ladder fit, so the cut is a searchsorted
+        # row slice (block views) rather than a boolean-mask copy; fall
+        # back to the mask if a wobbly spline broke monotonicity
+        basepairs = self.raw_data.basepairs.to_numpy()
+        if basepairs.size and np.all(np.diff(basepairs) >= 0):
+            start = np.searchsorted(basepairs, self.search_peaks_start, side="right")
+            self.peaks_dataframe = self.raw_data.iloc[start:]
+        else:
+            self.peaks_dataframe = self.raw_data.loc[
+                basepairs > self.search_peaks_start
+            ]
 
         # Validation of custom_peaks
         self.run_validation()
         # find peaks, custom or agnostic
         self.find_peaks()
-        # continue whether peaks are found or not.
-        self.found_peaks()
+        # continue whether peaks are found or not; touching the property
+        # here logs the warning eagerly, while the run still has context
+        self.found_peaks
+
+    @functools.cached_property
+    def peak_information(self) -> pd.DataFrame:
+        return pd.DataFrame(self._peak_columns)
 
     def run_validation(self):
         if self.custom_peaks is None:
             return
 
-        if is_overlapping(self.custom_peaks):
-            raise OverlappingIntervalError("Overlapping intervals!")
-            exit(1)
-
-        if not has_columns(self.custom_peaks):
-            raise WrongColumnsError("Wrong columns!")
-            exit(1)
+        _validate_custom_peaks(
+            tuple(self.custom_peaks.columns),
+            tuple(self.custom_peaks.itertuples(index=False, name=None)),
+        )
 
     def find_peaks(self):
+        # the scipy detection is identical for both paths, so it runs
+        # once here and the branches only do their own filtering.
+        # hand scipy a flat contiguous array so its internal asarray is a
+        # no-op instead of a Series conversion
+        heights_arr = np.ascontiguousarray(self.peaks_dataframe["peaks"].to_numpy())
+        peaks_index, _ = find_peaks(heights_arr, height=self.peak_height)
+
         if self.custom_peaks is not None:
-            self.find_peaks_customized(
-                peak_height=self.peak_height,
-            )
+            self.find_peaks_customized(peaks_index)
         else:
             self.find_peaks_agnostic(
-                peak_height=self.peak_height,
+                peaks_index,
                 min_ratio=self.min_ratio,
                 distance_between_assays=self.distance_between_assays,
             )
 
-    def found_peaks(self):
+    @functools.cached_property
+    def found_peaks(self) -> bool:
         # if no peaks could be found
-        if self.peak_information.shape[0] == 0:
-            self.found_peaks = False
+        if self.peaks_index.size == 0:
             logging.warning(f"No peaks could be found. Please look at raw data.")
+            return False
         # if peaks are found
-        else:
-            self.found_peaks = True
+        return True
 
     def find_peaks_agnostic(
         self,
-        peak_height: int,
+        peaks_index: np.ndarray,
         min_ratio: float,
         distance_between_assays: int,
     ) -> None:
-        peaks_dataframe = self.raw_data.loc[
-            lambda x: x.basepairs > self.search_peaks_start
-        ]
-        peaks_index, _ = find_peaks(peaks_dataframe.peaks, height=peak_height)
-
-        peak_information = (
-            peaks_dataframe.iloc[peaks_index]
-            .assign(peaks_index=peaks_index)
-            .assign(peak_name=lambda x: range(1, x.shape[0] + 1))
-            # separate the peaks into different assay groups depending on the distance
-            # between the peaks
-            .assign(difference=lambda x: x.basepairs.diff())
-            .fillna(100)
-            .assign(
-                assay=lambda x: np.select(
-                    [x.difference > distance_between_assays],
-                    [x.peak_name * 10],
-                    default=pd.NA,
-                )
-            )
-            .fillna(method="ffill")
-            .assign(max_peak=lambda x: x.groupby("assay")["peaks"].transform(np.max))
-            .assign(ratio=lambda x: x.peaks / x.max_peak)
-            .loc[lambda x: x.ratio > min_ratio]
-            .assign(peak_name=lambda x: range(1, x.shape[0] + 1))
-        )
-
-        # update peaks_index based on the above filtering
-        peaks_index = peak_information.peaks_index.to_numpy()
+        peaks_dataframe = self.peaks_dataframe
+        # NB: find_peaks(distance=...) is not a substitute for the assay
+        # grouping below — it suppresses peaks closer than the threshold,
+        # whereas peaks within distance_between_assays belong to the same
+        # assay and must all be kept.
+
+        # Work on raw arrays instead of chained DataFrame copies
+        basepairs = peaks_dataframe.basepairs.to_numpy()[peaks_index]
+        heights = peaks_dataframe.peaks.to_numpy()[peaks_index]
+        time = peaks_dataframe.time.to_numpy()[peaks_index]
+
+        # separate the peaks into different assay groups depending on the distance
+        # between the peaks: every gap larger than the cutoff starts a new assay
+        difference = np.diff(basepairs, prepend=-np.inf)
+        new_assay = difference > distance_between_assays
+        assay = np.cumsum(new_assay)
+
+        if heights.size:
+            # per-assay maximum without a groupby: the peaks are already in
+            # basepair order, so each assay is one contiguous run
+            group_starts = np.flatnonzero(new_assay)
+            group_max = np.maximum.reduceat(heights, group_starts)
+            run_lengths = np.diff(np.append(group_starts, heights.size))
+            max_peak = np.repeat(group_max, run_lengths)
+            ratio = heights / max_peak
+        else:
+            ratio = heights
+        keep = ratio > min_ratio
+
+        # column arrays are kept as-is; the DataFrame view over them is
+        # materialized lazily by the peak_information property
+        self._peak_columns = {
+            "time": time[keep],
+            "peaks": heights[keep],
+            "basepairs": basepairs[keep],
+            "peaks_index": peaks_index[keep],
+            "assay": assay[keep],
+            "ratio": ratio[keep],
+            "peak_name": np.arange(1, np.count_nonzero(keep) + 1),
+        }
 
         # update class attributes
-        self.peaks_index = peaks_index
-        self.peaks_dataframe = peaks_dataframe
-        self.peak_information = peak_information
+        self.peaks_index = self._peak_columns["peaks_index"]
 
     def find_peaks_customized(
         self,
-        peak_height: int,
+        peaks_index: np.ndarray,
     ) -> None:
 
-        # Filter where to start search for the peaks
-        peaks_dataframe = self.raw_data.loc[
-            lambda x: x.basepairs > self.search_peaks_start
-        ]
-        # Find the peaks
-        peaks_index, _ = find_peaks(peaks_dataframe.peaks, height=peak_height)
-
+        peaks_dataframe = self.peaks_dataframe
         # Filter the df to get right peaks
         peak_information = peaks_dataframe.iloc[peaks_index].assign(
             peaks_index=peaks_index
         )
-        # Filter the above df based on the custom peaks from the user
-        customized_peaks = []
-        for assay in self.custom_peaks.itertuples():
-            df = (
-                peak_information.loc[lambda x: x.basepairs > assay.start]
-                .loc[lambda x: x.basepairs < assay.stop]
-                .assign(assay=assay.name)
-            )
-
-            # Rank the peaks by height and filter out the smallest ones
-            if assay.amount != 0:
-                df = (
-                    df.assign(rank_peak=lambda x: x.peaks.rank(ascending=False))
-                    .loc[lambda x: x.rank_peak <= assay.amount]
-                    .drop(columns=["rank_peak"])
-                )
-
-            customized_peaks.append(df)
+        # Bucket each peak into its custom interval in one pass.
+        # The intervals are disjoint (validated), so sorting by start and
+        # using searchsorted replaces the per-assay filter loop.
+        custom_peaks = self.custom_peaks.sort_values("start")
+        starts = custom_peaks.start.to_numpy()
+        stops = custom_peaks.stop.to_numpy()
+        names = custom_peaks.name.to_numpy()
+        amounts = custom_peaks.amount.to_numpy()
+
+        basepairs = peak_information.basepairs.to_numpy()
+        interval = np.searchsorted(starts, basepairs, side="right") - 1
+        inside = (
+            (interval >= 0)
+            & (basepairs > starts[interval])
+            & (basepairs < stops[interval])
+        )
 
         peak_information = (
-            pd.concat(customized_peaks)
-            .reset_index()
-            .assign(peak_name=lambda x: range(1, x.shape[0] + 1))
+            peak_information.loc[inside]
+            .assign(assay=names[interval[inside]])
+            .assign(amount=amounts[interval[inside]])
+            # Rank the peaks by height within each assay and filter out the
+            # smallest ones where an amount is given
+            .assign(
+                rank_peak=lambda x: x.groupby("assay")["peaks"].rank(
+                    method="first", ascending=False
+                )
+            )
+            .loc[lambda x: (x.amount == 0) | (x.rank_peak <= x.amount)]
+            .drop(columns=["amount", "rank_peak"])
+            .reset_index(drop=True)
+        )
+        # written directly as int64 instead of routing a range() through
+        # another .assign copy
+        peak_information["peak_name"] = np.arange(
+            1, len(peak_information) + 1, dtype=np.int64
         )
 
         # update peaks_index based on the above filtering
-        peaks_index = peak_information.peaks_index.to_numpy()
-
-        # update class attributes
-        self.peaks_index = peaks_index
-        self.peaks_dataframe = peaks_dataframe
+        # (assigning the DataFrame directly overrides the lazy property)
+        self.peaks_index = peak_information.peaks_index.to_numpy()
         self.peak_information = peak_information
@@ -1,25 +1,45 @@
+import os
 from pathlib import Path
 import logging
 from datetime import datetime
 
 
 def get_files(in_path: str) -> list[Path]:
-    # If in_path is a directory, get a list of all .fsa files in it
+    # If in_path is a directory, get a list of all .fsa files in it.
+    # os.scandir avoids a stat and a Path allocation per entry, which
+    # matters on cohort directories with thousands of files
     if Path(in_path).is_dir():
-        files = [x for x in Path(in_path).iterdir() if x.suffix == ".fsa"]
+        with os.scandir(in_path) as entries:
+            files = [
+                Path(entry.path)
+                for entry in entries
+                if entry.name.endswith(".fsa")
+                and entry.is_file(follow_symlinks=False)
+            ]
     else:
         files = [Path(in_path)]
     return files
 
 
+_logging_configured = False
+
+
 def setup_logging(outdir: str) -> None:
     """
     Set up the logging object and saves the log file to the same dir as the results files.
+    Repeated calls are no-ops, so library users looping over runs do not
+    stack one FileHandler per call and duplicate every message.
     """
-    NOW = datetime.now().strftime("%Y-%m-%d_%H:%M")
+    # the callers rely on this to create the results folder, so it runs
+    # even when logging is already configured
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
 
-    if not (outdir := Path(outdir)).exists():
-        outdir.mkdir(parents=True)
+    global _logging_configured
+    if _logging_configured or logging.getLogger().hasHandlers():
+        return
+
+    NOW = datetime.now().strftime("%Y-%m-%d_%H:%M")
 
     LOG_FILE = f"{outdir}/fraggler_{NOW}.log"
 
@@ -29,3 +49,4 @@ def setup_logging(outdir: str) -> None:
         datefmt="%Y-%m-%d %I:%M:%S",
         handlers=[logging.FileHandler(LOG_FILE), logging.StreamHandler()],
     )
+    _logging_configured = True
@@ -22,15 +22,16 @@ setuptools.setup(
         "numpy",
         "scikit-learn",
         "matplotlib",
-        "networkx",
-        "lmfit",
+        "joblib",
         "scipy",
         "biopython",
         "panel==0.14.2",
         "fire",
-        "openpyxl",
+        "xlsxwriter",
+        "pyarrow",
         "colorama",
         "altair",
+        "itables",
         "setuptools",
     ],
     entry_points={"console_scripts": ["fraggler=fraggler.cli:run"]},